@@ -1,6 +1,11 @@
 #!/usr/bin/env python3
 """
-Utility entrypoint that runs every data-processing script in sequence.
+Utility entrypoint that runs every data-processing script for a scenario.
+
+Stages follow the dependency graph in STAGE_DEPS: the preprocessing chain
+runs in this process, while terminal stages (tables, markdown) fan out to a
+process pool as soon as their inputs exist. Pass ``--jobs 1`` to run every
+script strictly in sequence.
 
 Usage:
     python run_all.py --scenario 2025              # run full pipeline for 2025
@@ -12,11 +17,16 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import importlib
+import io
+import multiprocessing
 import os
-import subprocess
 import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import redirect_stdout
 from pathlib import Path
-from typing import Iterable, List
+from types import ModuleType
+from typing import Any, Dict, Iterable, List, Set
 
 PROJECT_ROOT = Path(__file__).resolve().parent
 SCRIPTS_DIR = PROJECT_ROOT / "scripts"
@@ -33,7 +43,32 @@ SCRIPT_SEQUENCE: List[str] = [
     "23_build_timeline.py",
 ]
 
+# Scripts whose outputs each stage reads. Dependencies outside the selected
+# subset are assumed to be satisfied by files already on disk.
+STAGE_DEPS: Dict[str, List[str]] = {
+    "00_preprocess_source.py": [],
+    "01_derive_macro_features.py": ["00_preprocess_source.py"],
+    "02_select_factors.py": ["01_derive_macro_features.py"],
+    "10_compute_shocks.py": ["02_select_factors.py"],
+    "11_build_table_vs_lastyear.py": ["10_compute_shocks.py"],
+    "12_build_table_vs_history.py": ["10_compute_shocks.py"],
+    "13_build_table_vs_avg_gfc.py": ["10_compute_shocks.py"],
+    "21_build_key_commentary.py": ["02_select_factors.py", "10_compute_shocks.py"],
+    "22_build_summary.py": ["02_select_factors.py", "10_compute_shocks.py"],
+    "23_build_timeline.py": [],
+}
+
+# Stage whose returned t0 payload each stage takes as ``main(t0_payload)``.
+# The payload is only handed over when that producer ran in this pipeline;
+# otherwise the consumer reads the file from disk as it does standalone.
+T0_HANDOFF: Dict[str, str] = {
+    "01_derive_macro_features.py": "00_preprocess_source.py",
+    "02_select_factors.py": "01_derive_macro_features.py",
+    "10_compute_shocks.py": "02_select_factors.py",
+}
+
 DEFAULT_SCENARIO = "2025"
+DEFAULT_JOBS = os.cpu_count() or 1
 
 
 def validate_scripts(selection: Iterable[str]) -> List[Path]:
@@ -49,17 +84,117 @@ def validate_scripts(selection: Iterable[str]) -> List[Path]:
     return [SCRIPTS_DIR / script for script in ordered]
 
 
-def run_script(script_path: Path, scenario: str) -> None:
+def load_stage(script_path: Path) -> ModuleType:
+    """Import a pipeline script as a module (scripts import siblings like ``paths``)."""
     if not script_path.exists():
         raise SystemExit(f"Script not found: {script_path}")
 
-    # Pass scenario via environment variable
-    env = os.environ.copy()
-    env["FRB_SCENARIO"] = scenario
+    scripts_dir = str(script_path.parent)
+    if scripts_dir not in sys.path:
+        sys.path.insert(0, scripts_dir)
+    return importlib.import_module(script_path.stem)
+
+
+def run_script(script_path: Path, scenario: str, t0_payload: Dict[str, Any] | None = None) -> Any:
+    """Import a pipeline script as a module and call its ``main()`` in-process.
+
+    Running every stage in this interpreter means pandas and friends are
+    imported once per pipeline run instead of once per script. A
+    ``t0_payload`` from the previous t0 stage is passed on to ``main``, and
+    whatever ``main`` returns is returned.
+    """
+    module = load_stage(script_path)
+
+    # Scripts resolve their paths from the scenario environment variable;
+    # paths caches it, so drop any value cached for an earlier scenario.
+    os.environ["FRB_SCENARIO"] = scenario
+    importlib.import_module("paths").reset_scenario_cache()
 
-    cmd = [sys.executable, str(script_path)]
     print(f"\n==> Running {script_path.name} (scenario: {scenario})")
-    subprocess.run(cmd, check=True, env=env)
+    if t0_payload is None:
+        return module.main()
+    return module.main(t0_payload)
+
+
+def _t0_input(name: str, t0_payloads: Dict[str, Any]) -> Dict[str, Any] | None:
+    """The t0 payload ``name`` takes in memory, if its producer ran in this pipeline."""
+    producer = T0_HANDOFF.get(name)
+    return None if producer is None else t0_payloads.get(producer)
+
+
+def run_script_buffered(script_path: Path, scenario: str, t0_payload: Dict[str, Any] | None = None) -> str:
+    """``run_script`` in a pool worker, returning its printed output as one block.
+
+    The parent prints each finished stage's block whole, so output from stages
+    running side by side does not interleave. If the stage fails, whatever it
+    printed is written out before the error propagates.
+    """
+    buffer = io.StringIO()
+    try:
+        with redirect_stdout(buffer):
+            run_script(script_path, scenario, t0_payload)
+    except BaseException:
+        sys.stdout.write(buffer.getvalue())
+        sys.stdout.flush()
+        raise
+    return buffer.getvalue()
+
+
+def _pool_context() -> multiprocessing.context.BaseContext | None:
+    # Forked workers inherit the already-imported stage modules (and pandas).
+    # Only on Linux: elsewhere (macOS) fork after threads start is unsafe.
+    if sys.platform.startswith("linux"):
+        return multiprocessing.get_context("fork")
+    return None
+
+
+def run_pipeline(scripts: List[Path], scenario: str, jobs: int) -> None:
+    """Run the selected scripts, overlapping independent stages when jobs > 1."""
+    selected = {script.name: script for script in scripts}
+    deps = {name: [dep for dep in STAGE_DEPS[name] if dep in selected] for name in selected}
+    feeders = {dep for name_deps in deps.values() for dep in name_deps}
+    terminal = [name for name in selected if name not in feeders]
+    # Returned t0 payloads of the stages that ran here, by script name.
+    t0_payloads: Dict[str, Any] = {}
+
+    # Only terminal stages go to the pool; with one or none there is nothing
+    # to overlap, so skip starting worker processes.
+    if jobs <= 1 or len(terminal) <= 1:
+        for script in scripts:
+            t0_payloads[script.name] = run_script(script, scenario, _t0_input(script.name, t0_payloads))
+        return
+
+    for script in scripts:
+        load_stage(script)
+
+    pending = list(selected)
+    done: Set[str] = set()
+    running: Dict[Future, str] = {}
+
+    workers = min(jobs, len(terminal))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as pool:
+        while pending or running:
+            ready = [name for name in pending if all(dep in done for dep in deps[name])]
+
+            # Terminal stages go to the pool; stages that feed later ones run
+            # here, since that chain is strictly sequential anyway.
+            for name in ready:
+                if name not in feeders:
+                    pending.remove(name)
+                    t0_payload = _t0_input(name, t0_payloads)
+                    running[pool.submit(run_script_buffered, selected[name], scenario, t0_payload)] = name
+
+            chained = next((name for name in ready if name in feeders), None)
+            if chained is not None:
+                pending.remove(chained)
+                t0_payloads[chained] = run_script(selected[chained], scenario, _t0_input(chained, t0_payloads))
+                done.add(chained)
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                sys.stdout.write(future.result())
+                done.add(running.pop(future))
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -72,6 +207,12 @@ def build_parser() -> argparse.ArgumentParser:
         default=DEFAULT_SCENARIO,
         help=f"Year/scenario identifier (default: {DEFAULT_SCENARIO}). Examples: 2025, 2026-proposed, 2026-formal",
     )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Worker processes for independent stages (default: {DEFAULT_JOBS}). Use 1 to run serially.",
+    )
     parser.add_argument(
         "scripts",
         nargs="*",
@@ -88,8 +229,7 @@ def main(argv: Iterable[str] | None = None) -> None:
     print(f"Processing scenario: {scenario}")
 
     scripts_to_run = validate_scripts(args.scripts)
-    for script in scripts_to_run:
-        run_script(script, scenario)
+    run_pipeline(scripts_to_run, scenario, args.jobs)
 
     print(f"\nAll scripts completed successfully for scenario: {scenario}")
 
@@ -11,81 +11,82 @@ Steps
 
 from __future__ import annotations
 
-import json
-import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Callable, Dict, Iterable, List, Tuple, TypeVar
 
+import numpy as np
 import pandas as pd
 
-from paths import ScenarioPaths
+from io_utils import parquet_sibling, read_csv, write_csv, write_json
+from paths import ScenarioPaths, get_paths
+from quarters import DATE_COLUMN, quarter_sort_key, sort_by_date
 
 
-DATE_COLUMN = "Date"
 SCENARIO_COLUMN = "Scenario Name"
+# Name markers for each source kind and region; the first listed wins when a
+# file name carries several. Matching is order-independent within the name.
+SOURCE_KINDS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("historic", ("historic",)),
+    ("severely_adverse", ("severely_adverse", "severely-adverse")),
+    ("baseline", ("baseline",)),
+)
+SOURCE_REGIONS: Tuple[str, ...] = ("domestic", "international")
+
+T = TypeVar("T")
+
+
+def _classify_source(file_name: str) -> Tuple[str, str] | None:
+    """(kind, region) for a source CSV name, or None when it is not a source file."""
+    name = file_name.lower()
+    kind = next((kind for kind, markers in SOURCE_KINDS if any(m in name for m in markers)), None)
+    region = next((region for region in SOURCE_REGIONS if region in name), None)
+    if kind is None or region is None:
+        return None
+    return kind, region
 
 
 def get_source_files(paths: ScenarioPaths) -> Tuple[Dict[str, Path], Dict[str, Path], Dict[str, Path]]:
     """Discover source files based on naming convention."""
-    source_dir = paths.source_dir
-    
-    # Find files by pattern
-    historic_files: Dict[str, Path] = {}
-    sa_files: Dict[str, Path] = {}
-    baseline_files: Dict[str, Path] = {}
-    
-    for csv_file in source_dir.glob("*.csv"):
-        name = csv_file.name.lower()
-        if "historic" in name:
-            if "domestic" in name:
-                historic_files["domestic"] = csv_file
-            elif "international" in name:
-                historic_files["international"] = csv_file
-        elif "severely_adverse" in name or "severely-adverse" in name:
-            if "domestic" in name:
-                sa_files["domestic"] = csv_file
-            elif "international" in name:
-                sa_files["international"] = csv_file
-        elif "baseline" in name:
-            if "domestic" in name:
-                baseline_files["domestic"] = csv_file
-            elif "international" in name:
-                baseline_files["international"] = csv_file
-    
-    return historic_files, sa_files, baseline_files
+    by_kind: Dict[str, Dict[str, Path]] = {"historic": {}, "severely_adverse": {}, "baseline": {}}
+    for csv_file in paths.source_dir.glob("*.csv"):
+        key = _classify_source(csv_file.name)
+        if key is not None:
+            kind, region = key
+            by_kind[kind][region] = csv_file
+    return by_kind["historic"], by_kind["severely_adverse"], by_kind["baseline"]
 
 
-def _quarter_sort_key(dates: pd.Series) -> pd.Series:
-    extracted = dates.str.extract(r"(?P<year>\d{4})\s*Q(?P<quarter>\d)", expand=True)
-    if extracted.isnull().any().any():
-        raise ValueError("Date column must follow the 'YYYY Qn' format.")
-    return extracted["year"].astype(int) * 10 + extracted["quarter"].astype(int)
+def _map_threaded(func: Callable[[Path], T], csv_paths: Iterable[Path]) -> List[T]:
+    """Apply ``func`` to every path on its own thread; results keep input order.
 
-
-def sort_by_date(df: pd.DataFrame) -> pd.DataFrame:
-    sort_key = _quarter_sort_key(df[DATE_COLUMN])
-    return df.assign(_sort_key=sort_key).sort_values("_sort_key").drop(columns="_sort_key")
-
-
-def _to_float_or_none(value) -> float | None:
-    if pd.isna(value):
-        return None
-    try:
-        return float(value)
-    except (TypeError, ValueError):
-        return None
+    The CSV parsers release the GIL, so each region's file is read concurrently.
+    """
+    csv_paths = list(csv_paths)
+    if len(csv_paths) < 2:
+        return [func(csv_path) for csv_path in csv_paths]
+    with ThreadPoolExecutor(max_workers=len(csv_paths)) as executor:
+        return list(executor.map(func, csv_paths))
 
 
 def extract_t0(df: pd.DataFrame) -> Tuple[str, Dict[str, float | None]]:
-    ordered = sort_by_date(df)
-    t0_row = ordered.iloc[-1]
+    # The latest quarter is all that is needed, so find it without sorting the
+    # frame; on ties take the last such row, as a stable sort would leave it.
+    key = quarter_sort_key(df[DATE_COLUMN]).to_numpy()
+    t0_row = df.iloc[len(key) - 1 - int(np.argmax(key[::-1]))]
     t0_date = str(t0_row[DATE_COLUMN])
 
-    factors: Dict[str, float | None] = {}
-    for column in ordered.columns:
-        if column in {DATE_COLUMN, SCENARIO_COLUMN}:
-            continue
-        factors[column] = _to_float_or_none(t0_row[column])
+    values = pd.to_numeric(
+        t0_row.drop(labels=[DATE_COLUMN, SCENARIO_COLUMN], errors="ignore"),
+        errors="coerce",
+    )
+    # One float cast and one NaN mask for the whole row, then a plain dict build.
+    floats = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    missing = np.isnan(floats).tolist()
+    factors: Dict[str, float | None] = {
+        column: None if absent else value
+        for column, value, absent in zip(values.index, floats.tolist(), missing)
+    }
 
     return t0_date, factors
 
@@ -94,9 +95,8 @@ def build_t0_payload(historic_files: Dict[str, Path]) -> Dict[str, object]:
     combined_factors: Dict[str, float | None] = {}
     t0_dates: List[str] = []
 
-    for region, csv_path in historic_files.items():
-        df = pd.read_csv(csv_path)
-        t0_date, factors = extract_t0(df)
+    extracted = _map_threaded(lambda csv_path: extract_t0(read_csv(csv_path)), historic_files.values())
+    for region, (t0_date, factors) in zip(historic_files, extracted):
         t0_dates.append(t0_date)
 
         for name, value in factors.items():
@@ -115,42 +115,77 @@ def build_t0_payload(historic_files: Dict[str, Path]) -> Dict[str, object]:
 
 
 def _numeric_columns(df: pd.DataFrame, ignore: Iterable[str]) -> pd.DataFrame:
-    for column in df.columns:
-        if column in ignore:
-            continue
-        df[column] = pd.to_numeric(df[column], errors="coerce")
+    # read_csv already parses clean numeric columns; only coerce the rest, and
+    # do it in one block assignment rather than one column at a time.
+    ignored = set(ignore)
+    to_coerce = [
+        column
+        for column, dtype in df.dtypes.items()
+        if column not in ignored and not pd.api.types.is_numeric_dtype(dtype)
+    ]
+    if to_coerce:
+        df[to_coerce] = df[to_coerce].apply(pd.to_numeric, errors="coerce")
     return df
 
 
-def build_scenario_path(file_map: Dict[str, Path]) -> pd.DataFrame:
-    dataframes: List[pd.DataFrame] = []
-    column_order: List[str] = [DATE_COLUMN]
-
-    for csv_path in file_map.values():
-        df = pd.read_csv(csv_path)
-        df = sort_by_date(df)
-        df = df.drop(columns=[SCENARIO_COLUMN], errors="ignore")
-        df = _numeric_columns(df, ignore=[DATE_COLUMN])
-        dataframes.append(df)
-
-        for col in df.columns:
-            if col == DATE_COLUMN or col in column_order:
-                continue
-            column_order.append(col)
+def _load_scenario_frame(csv_path: Path) -> pd.DataFrame:
+    df = read_csv(
+        csv_path,
+        usecols=lambda column: column != SCENARIO_COLUMN,
+        dtype={DATE_COLUMN: str},
+    )
+    return _numeric_columns(df, ignore=[DATE_COLUMN])
 
-    if not dataframes:
+
+def build_scenario_path(file_map: Dict[str, Path]) -> pd.DataFrame:
+    if not file_map:
         raise ValueError("No scenario files were provided.")
 
-    merged = dataframes[0]
-    for df in dataframes[1:]:
-        merged = pd.merge(merged, df, on=DATE_COLUMN, how="outer", sort=False)
+    dataframes = _map_threaded(_load_scenario_frame, file_map.values())
+    # Insertion-ordered dict as an ordered set: first appearance wins, O(1) lookups.
+    column_order: Dict[str, None] = {DATE_COLUMN: None}
+    for region, df in zip(file_map, dataframes):
+        for column in df.columns:
+            # Both joins below place columns by name, so a shared name would
+            # silently overwrite (or, via pd.merge, be suffixed); refuse it.
+            if column in column_order and column != DATE_COLUMN:
+                raise ValueError(f"Duplicate column name '{column}' found while merging {region}.")
+            column_order[column] = None
+
+    # The positional join below needs one row per Date in every input; with
+    # repeated labels, let pd.merge pair the duplicates up as it always has.
+    if not all(df[DATE_COLUMN].is_unique for df in dataframes):
+        merged = dataframes[0]
+        for df in dataframes[1:]:
+            merged = pd.merge(merged, df, on=DATE_COLUMN, how="outer", sort=False)
+        return sort_by_date(merged)[list(column_order)]
+
+    # Outer-join on Date by hand: collect the union of Date labels once, sort it
+    # by quarter, then scatter each input's columns into rows by position.
+    labels = pd.Index(pd.unique(np.concatenate([df[DATE_COLUMN].to_numpy() for df in dataframes])))
+    labels = labels[np.argsort(quarter_sort_key(labels.to_series()).to_numpy(), kind="stable")]
+    n_rows = len(labels)
+
+    columns: Dict[str, np.ndarray] = {DATE_COLUMN: labels.to_numpy()}
+    for df in dataframes:
+        positions = labels.get_indexer(df[DATE_COLUMN])
+        # Dates are unique here, so a full-length input fills every row.
+        covers_all = len(df) == n_rows
+        for column in df.columns:
+            if column == DATE_COLUMN:
+                continue
+            values = df[column].to_numpy()
+            # Rows missing from this input stay NaN, as in an outer merge.
+            merged = np.empty(n_rows, dtype=values.dtype) if covers_all else np.full(n_rows, np.nan)
+            merged[positions] = values
+            columns[column] = merged
 
-    merged = sort_by_date(merged)
-    return merged[column_order]
+    return pd.DataFrame(columns)[list(column_order)]
 
 
-def main() -> None:
-    paths = ScenarioPaths()
+def main() -> Dict[str, object]:
+    """Run the stage; returns the t0 payload it wrote, for stage 01 to take in memory."""
+    paths = get_paths()
     paths.ensure_dirs()
     
     historic_files, sa_files, baseline_files = get_source_files(paths)
@@ -165,18 +200,19 @@ def main() -> None:
     baseline_path_csv = paths.intermediate_dir / "path_baseline_source.csv"
 
     t0_payload = build_t0_payload(historic_files)
-    t0_json_path.write_text(json.dumps(t0_payload, indent=2))
+    write_json(t0_payload, t0_json_path)
 
     sa_path_df = build_scenario_path(sa_files)
-    sa_path_df.to_csv(sa_path_csv, index=False)
+    write_csv(sa_path_df, sa_path_csv, parquet_path=parquet_sibling(sa_path_csv))
 
     if baseline_files:
         baseline_path_df = build_scenario_path(baseline_files)
-        baseline_path_df.to_csv(baseline_path_csv, index=False)
+        write_csv(baseline_path_df, baseline_path_csv, parquet_path=parquet_sibling(baseline_path_csv))
         print(f"Saved Baseline path csv -> {baseline_path_csv}")
 
     print(f"Saved t0 json -> {t0_json_path}")
     print(f"Saved SA path csv -> {sa_path_csv}")
+    return t0_payload
 
 
 if __name__ == "__main__":
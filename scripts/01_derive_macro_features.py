@@ -11,16 +11,17 @@ Derive additional macro variables for downstream shock analysis.
 
 from __future__ import annotations
 
-import json
 from pathlib import Path
-from typing import Dict, Iterable
+from typing import Any, Dict, Iterable, List, Tuple
 
+import numpy as np
 import pandas as pd
 
-from paths import ScenarioPaths
+from io_utils import parquet_sibling, read_frame, read_json, write_csv, write_json
+from paths import get_paths
+from quarters import DATE_COLUMN, sort_by_date
 
 
-DATE_COLUMN = "Date"
 REAL_GDP_GROWTH = "Real GDP growth"
 REAL_GDP_LEVEL = "Real GDP level (index)"
 TEN_YEAR_YIELD = "10-year Treasury yield"
@@ -38,31 +39,17 @@ GDP_GROWTH_TO_LEVEL = {
 }
 
 
-def quarter_sort_key(series: pd.Series) -> pd.Series:
-    extracted = series.str.extract(r"(?P<year>\d{4})\s*Q(?P<quarter>\d)", expand=True)
-    if extracted.isnull().any().any():
-        raise ValueError("Date column must follow the 'YYYY Qn' format.")
-    return extracted["year"].astype(int) * 10 + extracted["quarter"].astype(int)
-
-
-def sort_by_date(df: pd.DataFrame) -> pd.DataFrame:
-    order = quarter_sort_key(df[DATE_COLUMN])
-    return df.assign(_order=order).sort_values("_order").drop(columns="_order")
-
-
 def compute_level_from_growth(series: pd.Series, base_level: float = 100.0) -> pd.Series:
-    levels: list[float | pd._libs.missing.NAType] = []
-    prev = base_level
+    rates = pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64)
+    missing = np.isnan(rates)
 
-    for growth in series:
-        rate = pd.to_numeric(growth, errors="coerce")
-        if pd.isna(rate):
-            levels.append(pd.NA)
-            continue
-        prev = prev * (1 + rate / 100.0) ** 0.25
-        levels.append(prev)
+    # Missing quarters carry the previous level forward (growth factor of 1).
+    factors = np.power(1 + np.where(missing, 0.0, rates) / 100.0, 0.25)
+    # Seed the running product with the base level so it compounds in the
+    # same order as stepping through the quarters one at a time.
+    levels = np.cumprod(np.concatenate(([base_level], factors)))[1:]
 
-    return pd.Series(levels, index=series.index).round(4)
+    return pd.Series(levels, index=series.index).mask(missing).round(4)
 
 
 def compute_spread(df: pd.DataFrame, numerator: str, denominator: str) -> pd.Series:
@@ -72,66 +59,91 @@ def compute_spread(df: pd.DataFrame, numerator: str, denominator: str) -> pd.Ser
     ).round(4)
 
 
-def insert_column_after(df: pd.DataFrame, anchor: str, column: str, values: Iterable) -> pd.DataFrame:
-    if anchor not in df.columns:
-        raise KeyError(f"Anchor column '{anchor}' not found in DataFrame.")
+def splice_after(order: Iterable[str], insertions: Iterable[Tuple[str, str]], strict: bool) -> List[str]:
+    """Names in ``order`` after placing each (anchor, name) right after its anchor, in turn.
+
+    Gives the same order as inserting one at a time: an existing name is
+    moved, and a later insertion may anchor on an earlier one. A missing
+    anchor raises KeyError when ``strict``, otherwise the name is appended.
+    Only the list of names is rebuilt, never the data itself.
+    """
+    result = list(order)
+    for anchor, name in insertions:
+        if anchor not in result:
+            if strict:
+                raise KeyError(f"Anchor column '{anchor}' not found in DataFrame.")
+            if name in result:
+                result.remove(name)
+            result.append(name)
+            continue
+        if name in result:
+            result.remove(name)
+        result.insert(result.index(anchor) + 1, name)
+    return result
 
-    if column in df.columns:
-        df = df.drop(columns=[column])
 
-    df[column] = values
-    columns = [col for col in df.columns if col != column]
-    anchor_position = columns.index(anchor) + 1
-    columns.insert(anchor_position, column)
-    return df[columns]
+def insert_columns_after(df: pd.DataFrame, insertions: List[Tuple[str, str, Iterable]]) -> pd.DataFrame:
+    """Add (anchor, column, values) columns and reorder the frame once.
+
+    Each new column lands right after its anchor; an existing column with the
+    same name is replaced and moved.
+    """
+    final_order = splice_after(df.columns, [(anchor, column) for anchor, column, _ in insertions], strict=True)
+    for _, column, values in insertions:
+        df[column] = values
+
+    # Columns appended after a trailing anchor, or replaced where they already
+    # sit, need no reorder (and no copy).
+    if final_order == df.columns.tolist():
+        return df
+    return df.reindex(columns=final_order)
 
 
 def update_path_source(csv_path: Path) -> None:
     if not csv_path.exists():
         return
         
-    df = pd.read_csv(csv_path)
+    df = read_frame(csv_path, parquet_sibling(csv_path))
     df = sort_by_date(df)
 
-    for growth_col, level_col in GDP_GROWTH_TO_LEVEL.items():
-        if growth_col not in df.columns:
-            continue
-        level_series = compute_level_from_growth(df[growth_col])
-        df = insert_column_after(df, growth_col, level_col, level_series.round(4))
-
-    bbb_spread = compute_spread(df, BBB_YIELD, TEN_YEAR_YIELD)
-    mortgage_spread = compute_spread(df, MORTGAGE_RATE, TEN_YEAR_YIELD)
+    present = frozenset(df.columns)
+    insertions: List[Tuple[str, str, Iterable]] = [
+        (growth_col, level_col, compute_level_from_growth(df[growth_col]))
+        for growth_col, level_col in GDP_GROWTH_TO_LEVEL.items()
+        if growth_col in present
+    ]
 
-    df = insert_column_after(df, BBB_YIELD, BBB_SPREAD, bbb_spread)
-    df = insert_column_after(df, MORTGAGE_RATE, MORTGAGE_SPREAD, mortgage_spread)
+    insertions.append((BBB_YIELD, BBB_SPREAD, compute_spread(df, BBB_YIELD, TEN_YEAR_YIELD)))
+    insertions.append((MORTGAGE_RATE, MORTGAGE_SPREAD, compute_spread(df, MORTGAGE_RATE, TEN_YEAR_YIELD)))
 
-    df.to_csv(csv_path, index=False)
+    df = insert_columns_after(df, insertions)
+    write_csv(df, csv_path, parquet_path=parquet_sibling(csv_path))
 
 
-def insert_key_after(mapping: Dict[str, float | None], anchor: str, key: str, value: float | None) -> Dict[str, float | None]:
-    if key in mapping:
-        mapping = {k: v for k, v in mapping.items() if k != key}
+def insert_keys_after(
+    mapping: Dict[str, float | None],
+    insertions: List[Tuple[str, str, float | None]],
+) -> Dict[str, float | None]:
+    """Rebuild ``mapping`` once with each (anchor, key, value) placed after its anchor.
 
-    result: Dict[str, float] = {}
-    inserted = False
-    for current_key, current_value in mapping.items():
-        result[current_key] = current_value
-        if current_key == anchor:
-            result[key] = value
-            inserted = True
+    Existing keys are moved; keys whose anchor is missing are appended.
+    """
+    values = dict(mapping)
+    values.update((key, value) for _, key, value in insertions)
+    order = splice_after(mapping, [(anchor, key) for anchor, key, _ in insertions], strict=False)
+    return {key: values[key] for key in order}
 
-    if not inserted:
-        result[key] = value
-    return result
 
+def update_t0_source(t0_path: Path, payload: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    """Add the derived factors to the t0 payload and write it back to ``t0_path``.
 
-def update_t0_source(t0_path: Path) -> None:
-    payload = json.loads(t0_path.read_text())
+    ``payload`` is the t0_source content already in memory (from stage 00);
+    without it the file is read. The updated payload is returned.
+    """
+    if payload is None:
+        payload = read_json(t0_path)
     factors: Dict[str, float] = payload["factors"]
 
-    for growth_col, level_col in GDP_GROWTH_TO_LEVEL.items():
-        factors = insert_key_after(factors, growth_col, level_col, 100.0)
-
     ten_year = factors.get(TEN_YEAR_YIELD)
     bbb = factors.get(BBB_YIELD)
     mortgage = factors.get(MORTGAGE_RATE)
@@ -139,15 +151,20 @@ def update_t0_source(t0_path: Path) -> None:
     bbb_spread_value = None if None in (bbb, ten_year) else round(bbb - ten_year, 4)
     mortgage_spread_value = None if None in (mortgage, ten_year) else round(mortgage - ten_year, 4)
 
-    factors = insert_key_after(factors, BBB_YIELD, BBB_SPREAD, bbb_spread_value)
-    factors = insert_key_after(factors, MORTGAGE_RATE, MORTGAGE_SPREAD, mortgage_spread_value)
+    insertions: List[Tuple[str, str, float | None]] = [
+        (growth_col, level_col, 100.0) for growth_col, level_col in GDP_GROWTH_TO_LEVEL.items()
+    ]
+    insertions.append((BBB_YIELD, BBB_SPREAD, bbb_spread_value))
+    insertions.append((MORTGAGE_RATE, MORTGAGE_SPREAD, mortgage_spread_value))
 
-    payload["factors"] = factors
-    t0_path.write_text(json.dumps(payload, indent=2))
+    payload["factors"] = insert_keys_after(factors, insertions)
+    write_json(payload, t0_path)
+    return payload
 
 
-def main() -> None:
-    paths = ScenarioPaths()
+def main(t0_payload: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    """Run the stage; ``t0_payload`` is stage 00's output, when run in the same process."""
+    paths = get_paths()
     
     sa_source = paths.intermediate_dir / "path_SA_source.csv"
     baseline_source = paths.intermediate_dir / "path_baseline_source.csv"
@@ -159,8 +176,9 @@ def main() -> None:
     
     update_path_source(sa_source)
     update_path_source(baseline_source)
-    update_t0_source(t0_source)
+    t0_payload = update_t0_source(t0_source, t0_payload)
     print("Derived macro features saved.")
+    return t0_payload
 
 
 if __name__ == "__main__":
@@ -11,20 +11,20 @@ Outputs
 
 from __future__ import annotations
 
-import json
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Tuple
 
 import pandas as pd
 
-from paths import ScenarioPaths
+from io_utils import parquet_sibling, read_frame, read_json, write_csv, write_json
+from paths import get_paths
 
 
 DATE_COLUMN = "Date"
 
 
 def load_mapping(config_path: Path) -> List[Tuple[str, str]]:
-    config = json.loads(config_path.read_text())
+    config = read_json(config_path)
     factors = config.get("factors", [])
     pairs: List[Tuple[str, str]] = []
     for entry in factors:
@@ -34,25 +34,42 @@ def load_mapping(config_path: Path) -> List[Tuple[str, str]]:
     return pairs
 
 
+def apply_mapping(df: pd.DataFrame, mapping: List[Tuple[str, str]]) -> pd.DataFrame:
+    """Keep Date plus the mapped source columns, in mapping order, under their factor names."""
+    ordered_sources = [source for _, source in mapping]
+    renamed = {source: name for name, source in mapping}
+    return df[[DATE_COLUMN] + ordered_sources].rename(columns=renamed)
+
+
 def select_from_path(mapping: List[Tuple[str, str]], input_path: Path, output_path: Path) -> None:
     if not input_path.exists():
         return
         
-    df = pd.read_csv(input_path)
+    # Only Date and the mapped sources are parsed; every other column is pruned.
+    needed = [DATE_COLUMN] + [source for _, source in mapping]
+    df = read_frame(input_path, parquet_sibling(input_path), columns=needed)
     missing = [source for _, source in mapping if source not in df.columns]
     if missing:
         raise KeyError(f"Columns missing in {input_path}: {missing}")
 
-    ordered_sources = [source for _, source in mapping]
-    renamed = {source: name for name, source in mapping}
-
-    selected = df[[DATE_COLUMN] + ordered_sources].rename(columns=renamed)
-    selected.to_csv(output_path, index=False)
+    selected = apply_mapping(df, mapping)
+    write_csv(selected, output_path, parquet_path=parquet_sibling(output_path))
     print(f"Saved -> {output_path}")
 
 
-def select_from_t0(mapping: List[Tuple[str, str]], t0_source: Path, t0_output: Path) -> None:
-    payload = json.loads(t0_source.read_text())
+def select_from_t0(
+    mapping: List[Tuple[str, str]],
+    t0_source: Path,
+    t0_output: Path,
+    payload: Dict[str, Any] | None = None,
+) -> Dict[str, Any]:
+    """Write the mapped t0 factors to ``t0_output`` and return that payload.
+
+    ``payload`` is the t0_source content already in memory (from stage 01);
+    without it ``t0_source`` is read.
+    """
+    if payload is None:
+        payload = read_json(t0_source)
     selected_factors: Dict[str, float | None] = {}
     factors: Dict[str, float | None] = payload["factors"]
 
@@ -65,12 +82,14 @@ def select_from_t0(mapping: List[Tuple[str, str]], t0_source: Path, t0_output: P
         "date": payload["date"],
         "factors": selected_factors,
     }
-    t0_output.write_text(json.dumps(output_payload, indent=2))
+    write_json(output_payload, t0_output)
     print(f"Saved -> {t0_output}")
+    return output_payload
 
 
-def main() -> None:
-    paths = ScenarioPaths()
+def main(t0_payload: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    """Run the stage; ``t0_payload`` is stage 01's output, when run in the same process."""
+    paths = get_paths()
     
     mapping = load_mapping(paths.factor_mapping_path)
     
@@ -83,7 +102,7 @@ def main() -> None:
     
     select_from_path(mapping, sa_source, sa_output)
     select_from_path(mapping, baseline_source, baseline_output)
-    select_from_t0(mapping, t0_source, t0_output)
+    return select_from_t0(mapping, t0_source, t0_output, t0_payload)
 
 
 if __name__ == "__main__":
@@ -16,17 +16,26 @@ Output
 
 from __future__ import annotations
 
-import json
+from collections import defaultdict
 from pathlib import Path
-from typing import Any, Callable, Dict, Literal, TypedDict
+from typing import Any, Dict, Iterable, Literal, TypedDict
 
+import numpy as np
 import pandas as pd
 
-from paths import ScenarioPaths
+from io_utils import read_frame, read_json, write_json
+from paths import get_paths
+
+try:
+    from numba import njit  # type: ignore[import-untyped]
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 
 DATE_COLUMN = "Date"
 ExtremeKind = Literal["min", "max", "range"]
+SHOCK_METHODS = frozenset({"level_pct_vs_t0", "level_delta_vs_t0", "rate_range"})
 
 
 class FactorConfig(TypedDict, total=False):
@@ -36,136 +45,193 @@ class FactorConfig(TypedDict, total=False):
 
 
 def load_config(config_path: Path) -> list[FactorConfig]:
-    config_raw = json.loads(config_path.read_text())
+    config_raw = read_json(config_path)
     return config_raw.get("factors", [])
 
 
-def load_inputs(sa_csv: Path, t0_json: Path) -> tuple[pd.DataFrame, Dict[str, Any]]:
-    df = pd.read_csv(sa_csv)
+def load_inputs(
+    sa_csv: Path,
+    t0_json: Path,
+    sa_parquet: Path | None = None,
+    factor_names: Iterable[str] | None = None,
+    t0_factors: Dict[str, Any] | None = None,
+) -> tuple[pd.DataFrame, Dict[str, Any]]:
+    """Load the SA path and the t0 factors; given ``t0_factors``, t0.json is not read."""
+    columns = None if factor_names is None else [DATE_COLUMN, *factor_names]
+    df = read_frame(sa_csv, sa_parquet, columns=columns)
     if DATE_COLUMN not in df.columns:
         raise KeyError(f"Column '{DATE_COLUMN}' missing in {sa_csv}")
 
-    t0_payload = json.loads(t0_json.read_text())
-    t0_factors: Dict[str, Any] = t0_payload.get("factors", {})
+    if t0_factors is None:
+        t0_factors = read_json(t0_json).get("factors", {})
     return df, t0_factors
 
 
-def numeric_series(df: pd.DataFrame, column: str) -> pd.Series:
-    if column not in df.columns:
-        raise KeyError(f"Column '{column}' missing in DataFrame")
-    return pd.to_numeric(df[column], errors="coerce")
-
-
-def pick_extreme(series: pd.Series, kind: ExtremeKind) -> float:
-    cleaned = series.dropna()
-    if cleaned.empty:
+def pick_extreme(low: float, high: float, kind: ExtremeKind) -> float:
+    if np.isnan(low):
         raise ValueError("Series has no numeric values for extreme calculation.")
     if kind == "min":
-        idx = cleaned.idxmin()
-    elif kind == "max":
-        idx = cleaned.idxmax()
-    else:
-        raise ValueError(f"Unsupported extreme kind '{kind}' for single extreme.")
-    return float(cleaned.loc[idx])
-
-
-def calc_level_pct_vs_t0(
-    series: pd.Series,
-    t0_value: float,
-    extreme: ExtremeKind,
-) -> Dict[str, Any]:
-    value = pick_extreme(series, extreme)
-    if t0_value in (None, 0):
+        return float(low)
+    if kind == "max":
+        return float(high)
+    raise ValueError(f"Unsupported extreme kind '{kind}' for single extreme.")
+
+
+def _nan_min_max(block: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Single pass over a 2-D ``block`` tracking each column's non-NaN min and max."""
+    n_rows, n_cols = block.shape
+    lows = np.full(n_cols, np.inf)
+    highs = np.full(n_cols, -np.inf)
+    found = np.zeros(n_cols, dtype=np.bool_)
+    for i in range(n_rows):
+        for j in range(n_cols):
+            value = block[i, j]
+            if value == value:
+                found[j] = True
+                if value < lows[j]:
+                    lows[j] = value
+                if value > highs[j]:
+                    highs[j] = value
+    for j in range(n_cols):
+        if not found[j]:
+            lows[j] = np.nan
+            highs[j] = np.nan
+    return lows, highs
+
+
+if NUMBA_AVAILABLE:
+    _nan_min_max = njit(cache=True)(_nan_min_max)
+
+
+def nan_extremes(block: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return per-column (min, max) of a 2-D block ignoring NaN; NaN where a column has no numbers."""
+    if NUMBA_AVAILABLE:
+        return _nan_min_max(np.ascontiguousarray(block, dtype=np.float64))
+
+    # One NaN mask for the whole block, then plain column reductions (np.nanmin
+    # and np.nanmax would each rebuild the mask and warn on empty columns).
+    valid = ~np.isnan(block)
+    lows = np.where(valid, block, np.inf).min(axis=0, initial=np.inf)
+    highs = np.where(valid, block, -np.inf).max(axis=0, initial=-np.inf)
+    empty = ~valid.any(axis=0)
+    lows[empty] = np.nan
+    highs[empty] = np.nan
+    return lows, highs
+
+
+def check_level_factor(
+    config: FactorConfig,
+    low: float,
+    high: float,
+    t0_factors: Dict[str, Any],
+) -> tuple[bool, float]:
+    """Validate a level_* factor's extreme and t0 value; return (uses max, t0 value)."""
+    extreme = config.get("extreme", "min")
+    pick_extreme(low, high, extreme)
+    t0_value = t0_factors.get(config["name"])
+    if config["shock_method"] == "level_pct_vs_t0" and t0_value in (None, 0):
         raise ValueError("t0_value must be non-null and non-zero for pct calculation.")
-    shock_pct = ((value / t0_value) - 1.0) * 100.0
-    return {
-        "extreme_value": value,
-        "shock_value": shock_pct,
-    }
-
-
-def calc_level_delta_vs_t0(
-    series: pd.Series,
-    t0_value: float,
-    extreme: ExtremeKind,
-) -> Dict[str, Any]:
-    value = pick_extreme(series, extreme)
     if t0_value is None:
         raise ValueError("t0_value must be available for delta calculation.")
-    delta = value - t0_value
-    return {
-        "extreme_value": value,
-        "shock_value": delta,
-    }
-
-
-def calc_rate_range(
-    series: pd.Series,
-) -> Dict[str, Any]:
-    cleaned = series.dropna()
-    if cleaned.empty:
-        raise ValueError("Series has no numeric values for rate range.")
-
-    min_idx = cleaned.idxmin()
-    max_idx = cleaned.idxmax()
-    min_val = float(cleaned.loc[min_idx])
-    max_val = float(cleaned.loc[max_idx])
-
-    range_payload = {
-        "min": min_val,
-        "max": max_val,
-    }
-    return {
-        "extreme_value": range_payload,
-        "shock_value": range_payload,
-    }
-
-
-CALCULATORS: Dict[str, Callable[..., Dict[str, Any]]] = {
-    "level_pct_vs_t0": calc_level_pct_vs_t0,
-    "level_delta_vs_t0": calc_level_delta_vs_t0,
-    "rate_range": calc_rate_range,
-}
+    return extreme == "max", t0_value
 
 
-def compute_factor_result(
+def compute_shocks(
     df: pd.DataFrame,
     t0_factors: Dict[str, Any],
-    config: FactorConfig,
+    configs: list[FactorConfig],
 ) -> Dict[str, Any]:
-    series = numeric_series(df, config["name"])
-    method = config["shock_method"]
-
-    if method not in CALCULATORS:
-        raise ValueError(f"Unknown shock method '{method}' for factor '{config['name']}'.")
-
-    calculator = CALCULATORS[method]
-
-    if method == "rate_range":
-        calc_result = calculator(series=series)
-    else:
-        t0_value = t0_factors.get(config["name"])
-        calc_result = calculator(
-            series=series,
-            t0_value=t0_value,
-            extreme=config.get("extreme", "min"),
-        )
-
-    return calc_result
-
-
-def main() -> None:
-    paths = ScenarioPaths()
+    """Compute every factor's shock with one min/max pass and one set of vectorized formulas."""
+    by_method: Dict[str, list[FactorConfig]] = defaultdict(list)
+    for cfg in configs:
+        method = cfg["shock_method"]
+        if method not in SHOCK_METHODS:
+            raise ValueError(f"Unknown shock method '{method}' for factor '{cfg['name']}'.")
+        by_method[method].append(cfg)
+
+    # Coerce every configured column once and reduce the whole block in one go.
+    columns = list(dict.fromkeys(cfg["name"] for cfg in configs))
+    missing = [column for column in columns if column not in df.columns]
+    if missing:
+        raise KeyError(f"Column '{missing[0]}' missing in DataFrame")
+    frame = df[columns]
+    # Parquet and in-process handoffs already deliver float64; only parse the rest.
+    coerced = {
+        column: pd.to_numeric(frame[column], errors="coerce")
+        for column, dtype in frame.dtypes.items()
+        if not pd.api.types.is_numeric_dtype(dtype)
+    }
+    if coerced:
+        frame = frame.assign(**coerced)
+    block = frame.to_numpy(dtype=np.float64)
+    lows, highs = nan_extremes(block)
+    position = {column: idx for idx, column in enumerate(columns)}
+
+    # Factors in processing order (method groups, then config order), so checks
+    # fail on the same factor, and duplicate names resolve the same way, as a
+    # one-factor-at-a-time loop.
+    ordered = [cfg for group in by_method.values() for cfg in group]
+    count = len(ordered)
+    idx = np.fromiter((position[cfg["name"]] for cfg in ordered), dtype=np.intp, count=count)
+    factor_lows = lows[idx]
+    factor_highs = highs[idx]
+
+    is_range = np.zeros(count, dtype=np.bool_)
+    is_pct = np.zeros(count, dtype=np.bool_)
+    use_max = np.zeros(count, dtype=np.bool_)
+    t0_values = np.full(count, np.nan)
+    for i, cfg in enumerate(ordered):
+        method = cfg["shock_method"]
+        if method == "rate_range":
+            if np.isnan(factor_lows[i]):
+                raise ValueError("Series has no numeric values for rate range.")
+            is_range[i] = True
+            continue
+        use_max[i], t0_values[i] = check_level_factor(cfg, factor_lows[i], factor_highs[i], t0_factors)
+        is_pct[i] = method == "level_pct_vs_t0"
+
+    # Every factor's extreme and shock in one set of masked array expressions.
+    extremes = np.where(use_max, factor_highs, factor_lows)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = ((extremes / t0_values) - 1.0) * 100.0
+    shocks = np.where(is_pct, pct, extremes - t0_values)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    rows = zip(
+        ordered,
+        is_range.tolist(),
+        factor_lows.tolist(),
+        factor_highs.tolist(),
+        extremes.tolist(),
+        shocks.tolist(),
+    )
+    for cfg, ranged, low, high, value, shock in rows:
+        if ranged:
+            range_payload = {"min": low, "max": high}
+            results[cfg["name"]] = {"extreme_value": range_payload, "shock_value": range_payload}
+        else:
+            results[cfg["name"]] = {"extreme_value": value, "shock_value": shock}
+
+    return {cfg["name"]: results[cfg["name"]] for cfg in configs}
+
+
+def main(t0_payload: Dict[str, Any] | None = None) -> None:
+    """Run the stage; ``t0_payload`` is stage 02's output, when run in the same process."""
+    paths = get_paths()
     
     configs = load_config(paths.shock_config_path)
-    df, t0_factors = load_inputs(paths.path_sa_csv, paths.t0_json)
+    df, t0_factors = load_inputs(
+        paths.path_sa_csv,
+        paths.t0_json,
+        paths.path_sa_parquet,
+        factor_names=[cfg["name"] for cfg in configs],
+        t0_factors=None if t0_payload is None else t0_payload.get("factors", {}),
+    )
 
-    summary: Dict[str, Any] = {}
-    for cfg in configs:
-        summary[cfg["name"]] = compute_factor_result(df, t0_factors, cfg)
+    summary = compute_shocks(df, t0_factors, configs)
 
     output_path = paths.shock_data_json
-    output_path.write_text(json.dumps(summary, indent=2))
+    write_json(summary, output_path)
     print(f"Shock summary written to {output_path}")
 
 
@@ -5,28 +5,54 @@ Build the current-vs-last-year table from shock_data.json and export to Excel.
 
 from __future__ import annotations
 
-import json
 import re
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Iterable, List, Tuple
 
 try:
     from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
     from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+    from openpyxl.utils import get_column_letter
     OPENPYXL_AVAILABLE = True
 except ImportError:
     OPENPYXL_AVAILABLE = False
 
-from paths import ScenarioPaths
+from io_utils import read_json, write_json
+from paths import ScenarioPaths, get_paths
+
+
+SCENARIO_NAME_PATTERN = re.compile(r'(CCAR \d{4})\s+(\(.+\))')
+
+
+def format_scenario_name(name: str) -> str:
+    """Break 'CCAR YYYY (...)' headers onto two lines."""
+    match = SCENARIO_NAME_PATTERN.match(name)
+    if match:
+        return f"{match.group(1)}\n{match.group(2)}"
+    return name
 
 
 def load_summary(paths: ScenarioPaths) -> Dict[str, Dict[str, Any]]:
-    return json.loads(paths.shock_data_json.read_text())
+    return read_json(paths.shock_data_json)
 
 
 def load_spec(paths: ScenarioPaths) -> Dict[str, Any]:
     spec_path = paths.table_config_dir / "table_vs_lastyear.json"
-    return json.loads(spec_path.read_text())
+    return read_json(spec_path)
+
+
+def low_high(values: Iterable[float]) -> Tuple[float, float]:
+    """Return (min, max) of ``values`` in a single pass."""
+    low = high = None
+    for value in values:
+        if low is None or value < low:
+            low = value
+        if high is None or value > high:
+            high = value
+    if low is None:
+        raise ValueError("low_high() arg is an empty iterable")
+    return low, high
 
 
 def base_context(entry: Dict[str, Any]) -> Dict[str, Any]:
@@ -35,49 +61,57 @@ def base_context(entry: Dict[str, Any]) -> Dict[str, Any]:
     extreme = entry.get("extreme_value")
 
     if isinstance(shock, dict):
-        values = list(shock.values())
-        ctx["high"] = max(values)
-        ctx["low"] = min(values)
+        ctx["low"], ctx["high"] = low_high(shock.values())
     elif shock is not None:
         ctx["shock"] = shock
         ctx["delta"] = shock
 
     if isinstance(extreme, dict):
-        ctx["extreme_high"] = max(extreme.values())
-        ctx["extreme_low"] = min(extreme.values())
+        ctx["extreme_low"], ctx["extreme_high"] = low_high(extreme.values())
     elif extreme is not None:
         ctx["extreme"] = extreme
 
     return ctx
 
 
-def render_value(entry: Dict[str, Any], spec: Dict[str, Any]) -> str:
-    ctx = base_context(entry)
+def compile_renderer(spec: Dict[str, Any]) -> Callable[[Dict[str, Any]], str]:
+    """Bind a value spec's template and delta scale into a ``ctx -> str`` renderer.
 
-    if "delta" in ctx and spec.get("delta_scale"):
-        ctx["delta"] = ctx["delta"] * spec["delta_scale"]
+    The renderer takes a context from ``base_context`` and never mutates it, so
+    one context per factor can be shared by every column rendering that factor.
+    """
+    render = spec["template"].format
+    delta_scale = spec.get("delta_scale")
 
-    template = spec["template"]
-    return template.format(**ctx)
+    if not delta_scale:
+        return lambda ctx: render(**ctx)
 
+    def render_scaled(ctx: Dict[str, Any]) -> str:
+        if "delta" not in ctx:
+            return render(**ctx)
+        return render(**{**ctx, "delta": ctx["delta"] * delta_scale})
 
-def build_table(paths: ScenarioPaths) -> Dict[str, Any]:
-    summary = load_summary(paths)
-    spec = load_spec(paths)
+    return render_scaled
+
+
+def build_table(spec: Dict[str, Any], summary: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
     columns = spec["columns"]
     factor_order: List[str] = spec["order"]
 
     result: Dict[str, Any] = {}
 
-    # Find the "Value" column spec
+    # Find the "Value" column spec and compile one renderer per factor up front
     value_column = next(col for col in columns if col.get("header") == "Value")
+    renderers: Dict[str, Callable[[Dict[str, Any]], str]] = {}
+    for value_spec in value_column["values"]:
+        renderers.setdefault(value_spec["source"], compile_renderer(value_spec))
 
+    # summary is a fresh parse owned by this call, so entries can take
+    # their display string in place.
     for factor in factor_order:
         entry = summary[factor]
-        result[factor] = entry.copy()
-        
-        value_spec = next(v for v in value_column["values"] if v["source"] == factor)
-        result[factor]["display"] = render_value(entry, value_spec)
+        entry["display"] = renderers[factor](base_context(entry))
+        result[factor] = entry
 
     return result
 
@@ -93,15 +127,16 @@ def export_to_excel(paths: ScenarioPaths, current_data: Dict[str, Any], spec: Di
         print(f"Warning: History file not found at {history_path}")
         return
     
-    history_data = json.loads(history_path.read_text())
+    history_data = read_json(history_path)
     
-    current_scenario = list(current_data.keys())[0]
+    current_scenario = next(iter(current_data))
     history_scenarios = sorted(history_data.keys())
     factor_order: List[str] = spec["order"]
     
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Comparison"
+    # Stream rows through a write-only sheet; styles are shared objects set
+    # on each WriteOnlyCell before the row is appended.
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Comparison")
     
     header_fill = PatternFill(start_color="0000FF", end_color="0000FF", fill_type="solid")
     header_font = Font(name="Inter", color="FFFFFF", bold=True, size=12)
@@ -116,54 +151,42 @@ def export_to_excel(paths: ScenarioPaths, current_data: Dict[str, Any], spec: Di
         bottom=Side(style="thin", color="000000")
     )
     
-    def format_scenario_name(name: str) -> str:
-        match = re.match(r'(CCAR \d{4})\s+(\(.+\))', name)
-        if match:
-            return f"{match.group(1)}\n{match.group(2)}"
-        return name
-    
-    headers = ["Factor"] + [format_scenario_name(s) for s in history_scenarios] + [format_scenario_name(current_scenario)]
-    
-    for col_idx, header in enumerate(headers, start=1):
-        cell = ws.cell(row=1, column=col_idx, value=header)
+    def header_cell(value: str) -> WriteOnlyCell:
+        cell = WriteOnlyCell(ws, value=value)
         cell.fill = header_fill
         cell.font = header_font
         cell.alignment = header_alignment
         cell.border = border
+        return cell
     
-    for row_idx, factor in enumerate(factor_order, start=2):
-        cell = ws.cell(row=row_idx, column=1, value=factor)
-        cell.font = cell_font
-        cell.alignment = cell_alignment
-        cell.border = border
-        
-        col_idx = 2
-        for scenario in history_scenarios:
-            if factor in history_data[scenario]:
-                display_value = history_data[scenario][factor].get("display", "")
-            else:
-                display_value = ""
-            cell = ws.cell(row=row_idx, column=col_idx, value=display_value)
-            cell.font = cell_font
-            cell.alignment = cell_alignment
-            cell.border = border
-            col_idx += 1
-        
-        if factor in current_data[current_scenario]:
-            display_value = current_data[current_scenario][factor].get("display", "")
-        else:
-            display_value = ""
-        cell = ws.cell(row=row_idx, column=col_idx, value=display_value)
+    def body_cell(value: str) -> WriteOnlyCell:
+        cell = WriteOnlyCell(ws, value=value)
         cell.font = cell_font
         cell.alignment = cell_alignment
         cell.border = border
+        return cell
+    
+    headers = ["Factor"] + [format_scenario_name(s) for s in history_scenarios] + [format_scenario_name(current_scenario)]
     
-    ws.column_dimensions['A'].width = 20
-    for col_idx in range(2, len(headers) + 1):
-        ws.column_dimensions[chr(64 + col_idx)].width = 18
+    # Dimensions must be in place before the first row is streamed out.
+    widths = [20] + [18] * (len(headers) - 1)
+    for col_idx, width in enumerate(widths, start=1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = width
     
     ws.row_dimensions[1].height = 30
     
+    ws.append([header_cell(header) for header in headers])
+    
+    scenario_tables = [history_data[scenario] for scenario in history_scenarios]
+    scenario_tables.append(current_data[current_scenario])
+    
+    for factor in factor_order:
+        row = [body_cell(factor)]
+        for table in scenario_tables:
+            display_value = table[factor].get("display", "") if factor in table else ""
+            row.append(body_cell(display_value))
+        ws.append(row)
+    
     output_path = paths.artifacts_dir / "table_vs_lastyear.xlsx"
     output_path.parent.mkdir(parents=True, exist_ok=True)
     wb.save(output_path)
@@ -171,16 +194,17 @@ def export_to_excel(paths: ScenarioPaths, current_data: Dict[str, Any], spec: Di
 
 
 def main() -> None:
-    paths = ScenarioPaths()
+    paths = get_paths()
     spec = load_spec(paths)
-    table = build_table(paths)
+    summary = load_summary(paths)
+    table = build_table(spec, summary)
     
     scenario_name = spec.get("scenario_name", "Unknown Scenario")
     output = {scenario_name: table}
     
     output_path = paths.current_dir / "table_vs_lastyear.json"
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(json.dumps(output, indent=2))
+    write_json(output, output_path)
     print(f"Saved JSON -> {output_path}")
     
     export_to_excel(paths, output, spec)
@@ -5,33 +5,41 @@ Build the historical comparison table from shock_data.json and export to Excel.
 
 from __future__ import annotations
 
-import json
+import string
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Iterable, List
 
 try:
     from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
     from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+    from openpyxl.utils import get_column_letter
     OPENPYXL_AVAILABLE = True
 except ImportError:
     OPENPYXL_AVAILABLE = False
 
-from paths import ScenarioPaths
+from io_utils import read_json, read_json_items, write_json
+from paths import ScenarioPaths, get_paths
 
 
-def load_summary(paths: ScenarioPaths) -> Dict[str, Dict[str, Any]]:
-    return json.loads(paths.shock_data_json.read_text())
+AVERAGE_SCENARIO = "Average FRB SA (2019-2025)"
+GFC_SCENARIO = "Financial Crisis Historical"
+
+
+def load_summary(paths: ScenarioPaths, factors: Iterable[str] | None = None) -> Dict[str, Dict[str, Any]]:
+    """Load shock_data.json, keeping only ``factors`` when given."""
+    if factors is None:
+        return read_json(paths.shock_data_json)
+    return read_json_items(paths.shock_data_json, factors)
 
 
 def load_spec(paths: ScenarioPaths) -> Dict[str, Any]:
     spec_path = paths.table_config_dir / "table_vs_history.json"
-    return json.loads(spec_path.read_text())
+    return read_json(spec_path)
 
 
-def build_table(paths: ScenarioPaths) -> Dict[str, Any]:
+def build_table(spec: Dict[str, Any], summary: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
     """Build current scenario data from shock_data.json."""
-    summary = load_summary(paths)
-    spec = load_spec(paths)
     factor_order: List[str] = spec["factor_order"]
     
     result: Dict[str, Any] = {}
@@ -49,6 +57,85 @@ def build_table(paths: ScenarioPaths) -> Dict[str, Any]:
     return result
 
 
+def order_scenarios(history_names: Iterable[str], current_scenario: str) -> List[str]:
+    """Row order in one pass: regular scenarios as listed, then the average, current and GFC rows."""
+    ordered: List[str] = []
+    has_average = has_gfc = False
+    for name in history_names:
+        if "Average" in name or "Financial Crisis" in name:
+            has_average = has_average or name == AVERAGE_SCENARIO
+            has_gfc = has_gfc or name == GFC_SCENARIO
+        else:
+            ordered.append(name)
+    
+    if has_average:
+        ordered.append(AVERAGE_SCENARIO)
+    ordered.append(current_scenario)
+    if has_gfc:
+        ordered.append(GFC_SCENARIO)
+    return ordered
+
+
+def row_style(scenario_name: str, current_scenario: str) -> str:
+    """Style class of a table row: the current scenario, the GFC row, an average, or regular."""
+    if scenario_name == current_scenario:
+        return "current"
+    if "Financial Crisis" in scenario_name:
+        return "gfc"
+    if "Average" in scenario_name:
+        return "average"
+    return "regular"
+
+
+def format_rows(
+    ordered_scenarios: List[str],
+    scenario_tables: Dict[str, Dict[str, Any]],
+    factor_order: List[str],
+    formatters: List[Callable[[Any], str]],
+) -> List[List[str]]:
+    """Display strings for every (scenario, factor) cell, row by row; empty where a value is missing."""
+    rows: List[List[str]] = []
+    for scenario_name in ordered_scenarios:
+        scenario_data = scenario_tables[scenario_name]
+        values = [scenario_data.get(factor) for factor in factor_order]
+        rows.append([
+            format_value(value) if value is not None else ""
+            for format_value, value in zip(formatters, values)
+        ])
+    return rows
+
+
+def compile_formatter(template: str | None) -> Callable[[Any], str]:
+    """Turn a column template into a ``value -> str`` callable, checked once up front.
+
+    Templates that are missing, malformed, or need fields other than ``shock``
+    can never render, so they compile straight to ``str``; value-dependent
+    failures (say, a float spec given text) still fall back to ``str(value)``.
+    """
+    if not isinstance(template, str):
+        return str
+    try:
+        fields = {
+            field_name.split(".")[0].split("[")[0]
+            for _, field_name, _, _ in string.Formatter().parse(template)
+            if field_name is not None
+        }
+    except ValueError:
+        return str
+    if not fields <= {"shock"}:
+        return str
+
+    render = template.format
+
+    def format_value(value: Any) -> str:
+        try:
+            return render(shock=value)
+        except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+            return str(value)
+
+    return format_value
+
+
 def export_to_excel(paths: ScenarioPaths, current_data: Dict[str, Any], spec: Dict[str, Any]) -> None:
     """Export historical comparison table to Excel with styling."""
     if not OPENPYXL_AVAILABLE:
@@ -60,17 +147,17 @@ def export_to_excel(paths: ScenarioPaths, current_data: Dict[str, Any], spec: Di
         print(f"Warning: History file not found at {history_path}")
         return
     
-    history_data = json.loads(history_path.read_text())
+    history_data = read_json(history_path)
     
     current_scenario = spec.get("scenario_name", "CCAR 2025 FRB SA")
-    current_scenario_data = {current_scenario: current_data}
     
     factor_order: List[str] = spec["factor_order"]
     columns_spec = spec["columns"]
     
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Historical Comparison"
+    # Stream rows through a write-only sheet: every style object below is
+    # built once and shared by the cells that use it.
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Historical Comparison")
     
     header_fill = PatternFill(start_color="0000FF", end_color="0000FF", fill_type="solid")
     header_font = Font(name="Inter", color="FFFFFF", bold=True, size=11)
@@ -106,113 +193,82 @@ def export_to_excel(paths: ScenarioPaths, current_data: Dict[str, Any], spec: Di
         bottom=None
     )
     
+    def styled_cell(
+        value: str,
+        font: Font,
+        alignment: Alignment,
+        cell_border: Border,
+        fill: PatternFill | None = None,
+    ) -> WriteOnlyCell:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.font = font
+        cell.alignment = alignment
+        cell.border = cell_border
+        if fill:
+            cell.fill = fill
+        return cell
+    
+    def edge_border(col_idx: int, n_cols: int) -> Border:
+        if col_idx == 1:
+            return border_left
+        if col_idx == n_cols:
+            return border_right
+        return border
+    
     headers = ["Scenario"]
     units = [""]
     
+    # First column spec per source wins; None where it has no template.
+    template_by_source: Dict[str, str | None] = {}
+    
     for col_spec in columns_spec[1:]:
         headers.append(col_spec.get("header", col_spec["source"]))
         units.append(col_spec.get("unit", ""))
+        template_by_source.setdefault(col_spec["source"], col_spec.get("template"))
     
-    for col_idx, header in enumerate(headers, start=1):
-        cell = ws.cell(row=1, column=col_idx, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
-        if col_idx == 1:
-            cell.border = border_left
-        elif col_idx == len(headers):
-            cell.border = border_right
-        else:
-            cell.border = border
+    # Dimensions must be in place before the first row is streamed out.
+    widths = [28] + [11] * (len(headers) - 1)
+    for col_idx, width in enumerate(widths, start=1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = width
     
-    for col_idx, unit in enumerate(units, start=1):
-        cell = ws.cell(row=2, column=col_idx, value=unit)
-        cell.fill = unit_fill
-        cell.font = unit_font
-        cell.alignment = unit_alignment
-        if col_idx == 1:
-            cell.border = border_left
-        elif col_idx == len(units):
-            cell.border = border_right
-        else:
-            cell.border = border
+    ws.row_dimensions[1].height = 30
+    ws.row_dimensions[2].height = 20
+    
+    ws.append([
+        styled_cell(header, header_font, header_alignment, edge_border(col_idx, len(headers)), header_fill)
+        for col_idx, header in enumerate(headers, start=1)
+    ])
+    ws.append([
+        styled_cell(unit, unit_font, unit_alignment, edge_border(col_idx, len(units)), unit_fill)
+        for col_idx, unit in enumerate(units, start=1)
+    ])
     
     green_fill = PatternFill(start_color="D1FAE5", end_color="D1FAE5", fill_type="solid")
     red_fill = PatternFill(start_color="FEE2E2", end_color="FEE2E2", fill_type="solid")
     
-    ordered_scenarios = []
-    
-    for scenario_name in history_data.keys():
-        if "Average" not in scenario_name and "Financial Crisis" not in scenario_name:
-            ordered_scenarios.append(scenario_name)
+    ordered_scenarios = order_scenarios(history_data, current_scenario)
     
-    if "Average FRB SA (2019-2025)" in history_data:
-        ordered_scenarios.append("Average FRB SA (2019-2025)")
+    # Phase 1: every display string and row style, with no openpyxl objects.
+    formatters = [compile_formatter(template_by_source.get(factor)) for factor in factor_order]
+    scenario_tables = {**history_data, current_scenario: current_data}
+    rows = format_rows(ordered_scenarios, scenario_tables, factor_order, formatters)
+    styles = [row_style(scenario_name, current_scenario) for scenario_name in ordered_scenarios]
     
-    ordered_scenarios.append(current_scenario)
+    # Phase 2: stream the rows out, looking each style class up in one table.
+    style_table = {
+        "regular": (scenario_font, cell_font, None),
+        "average": (scenario_font_bold, cell_font_bold, None),
+        "current": (scenario_font_bold, cell_font_bold, green_fill),
+        "gfc": (scenario_font_bold, cell_font_bold, red_fill),
+    }
+    value_borders = [border] * (len(factor_order) - 1) + [border_right]
     
-    if "Financial Crisis Historical" in history_data:
-        ordered_scenarios.append("Financial Crisis Historical")
-    
-    row_idx = 3
-    for scenario_name in ordered_scenarios:
-        is_bold_row = (
-            "Average" in scenario_name or 
-            scenario_name == current_scenario or 
-            "Financial Crisis" in scenario_name
-        )
-        
-        if scenario_name == current_scenario:
-            scenario_data = current_scenario_data[scenario_name]
-            row_fill = green_fill
-        else:
-            scenario_data = history_data[scenario_name]
-            if "Financial Crisis" in scenario_name:
-                row_fill = red_fill
-            else:
-                row_fill = None
-        
-        cell = ws.cell(row=row_idx, column=1, value=scenario_name)
-        cell.font = scenario_font_bold if is_bold_row else scenario_font
-        cell.alignment = scenario_alignment
-        cell.border = border_left
-        if row_fill:
-            cell.fill = row_fill
-        
-        for col_idx, factor in enumerate(factor_order, start=2):
-            value = scenario_data.get(factor)
-            
-            if value is not None:
-                col_spec = next((c for c in columns_spec[1:] if c["source"] == factor), None)
-                if col_spec and "template" in col_spec:
-                    template = col_spec["template"]
-                    try:
-                        display_value = template.format(shock=value)
-                    except:
-                        display_value = str(value)
-                else:
-                    display_value = str(value)
-            else:
-                display_value = ""
-            
-            cell = ws.cell(row=row_idx, column=col_idx, value=display_value)
-            cell.font = cell_font_bold if is_bold_row else cell_font
-            cell.alignment = cell_alignment
-            if col_idx == len(factor_order) + 1:
-                cell.border = border_right
-            else:
-                cell.border = border
-            if row_fill:
-                cell.fill = row_fill
-        
-        row_idx += 1
-    
-    ws.column_dimensions['A'].width = 28
-    for col_idx in range(2, len(headers) + 1):
-        ws.column_dimensions[chr(64 + col_idx)].width = 11
-    
-    ws.row_dimensions[1].height = 30
-    ws.row_dimensions[2].height = 20
+    for scenario_name, display_values, style in zip(ordered_scenarios, rows, styles):
+        name_font, row_font, row_fill = style_table[style]
+        row = [styled_cell(scenario_name, name_font, scenario_alignment, border_left, row_fill)]
+        for display_value, cell_border in zip(display_values, value_borders):
+            row.append(styled_cell(display_value, row_font, cell_alignment, cell_border, row_fill))
+        ws.append(row)
     
     output_path = paths.artifacts_dir / "table_vs_history.xlsx"
     output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -221,16 +277,17 @@ def export_to_excel(paths: ScenarioPaths, current_data: Dict[str, Any], spec: Di
 
 
 def main() -> None:
-    paths = ScenarioPaths()
+    paths = get_paths()
     spec = load_spec(paths)
-    table = build_table(paths)
+    summary = load_summary(paths, spec["factor_order"])
+    table = build_table(spec, summary)
     
     scenario_name = spec.get("scenario_name", "CCAR 2025 FRB SA")
     output = {scenario_name: table}
     
     output_path = paths.current_dir / "table_vs_history.json"
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(json.dumps(output, indent=2))
+    write_json(output, output_path)
     print(f"Saved JSON -> {output_path}")
     
     export_to_excel(paths, table, spec)
@@ -5,33 +5,36 @@ Build the avg/GFC comparison table with heatmap visualization.
 
 from __future__ import annotations
 
-import json
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterable
 
 try:
     from openpyxl import Workbook  # type: ignore[import-untyped]
+    from openpyxl.cell import WriteOnlyCell  # type: ignore[import-untyped]
     from openpyxl.styles import Font, PatternFill, Alignment, Border, Side  # type: ignore[import-untyped]
     OPENPYXL_AVAILABLE = True
 except ImportError:
     OPENPYXL_AVAILABLE = False
 
-from paths import ScenarioPaths
+from io_utils import read_json, read_json_items, write_json
+from paths import ScenarioPaths, get_paths
 
 
-def load_summary(paths: ScenarioPaths) -> Dict[str, Dict[str, Any]]:
-    return json.loads(paths.shock_data_json.read_text())
+def load_summary(paths: ScenarioPaths, factors: Iterable[str] | None = None) -> Dict[str, Dict[str, Any]]:
+    """Load shock_data.json, keeping only ``factors`` when given."""
+    if factors is None:
+        return read_json(paths.shock_data_json)
+    return read_json_items(paths.shock_data_json, factors)
 
 
 def load_spec(paths: ScenarioPaths) -> Dict[str, Any]:
     spec_path = paths.table_config_dir / "table_vs_avg_gfc.json"
-    return json.loads(spec_path.read_text())
+    return read_json(spec_path)
 
 
-def build_table(paths: ScenarioPaths) -> Dict[str, Any]:
+def build_table(spec: Dict[str, Any], summary: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
     """Build current scenario data from shock_data.json."""
-    summary = load_summary(paths)
-    spec = load_spec(paths)
     
     result: Dict[str, Any] = {}
     
@@ -51,16 +54,25 @@ def build_table(paths: ScenarioPaths) -> Dict[str, Any]:
     return result
 
 
-def get_color_for_abs_comparison(current_val: float, baseline_val: float, colors: Dict[str, Any]) -> PatternFill:
+@lru_cache(maxsize=None)
+def solid_fill(color: str) -> PatternFill:
+    """One shared solid PatternFill per colour (heatmap cells reuse a handful)."""
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+
+def get_color_for_abs_comparison(
+    current_val: float,
+    baseline_val: float,
+    green_fill: PatternFill,
+    red_fill: PatternFill,
+) -> PatternFill:
+    """Pick one of the caller's prebuilt heatmap fills; no style objects are made here."""
     if current_val is None or baseline_val is None:
-        return PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid")
+        return solid_fill("FFFFFF")
 
     if abs(current_val) >= abs(baseline_val):
-        color_value = colors.get("green", "C7EA46")
-    else:
-        color_value = colors.get("red", "C94A34")
-
-    return PatternFill(start_color=color_value, end_color=color_value, fill_type="solid")
+        return green_fill
+    return red_fill
 
 
 def export_to_excel(paths: ScenarioPaths, current_data: Dict[str, Any], spec: Dict[str, Any]) -> None:
@@ -70,19 +82,23 @@ def export_to_excel(paths: ScenarioPaths, current_data: Dict[str, Any], spec: Di
         return
     
     heatmap_colors = spec.get("heatmap_colors", {"green": "C7EA46", "red": "C94A34"})
+    green_fill = solid_fill(heatmap_colors.get("green", "C7EA46"))
+    red_fill = solid_fill(heatmap_colors.get("red", "C94A34"))
 
     history_path = paths.history_dir / "table_vs_avg_gfc.json"
     if not history_path.exists():
         print(f"Warning: History file not found at {history_path}")
         return
     
-    history_data = json.loads(history_path.read_text())
+    # Only the two comparison entries are used from the history file.
+    history_data = read_json_items(history_path, ["ccar_avg", "gfc"])
     ccar_avg_data = history_data.get("ccar_avg", {})
     gfc_data = history_data.get("gfc", {})
     
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Avg GFC Comparison"
+    # Stream rows through a write-only sheet: every style object below is
+    # built once and shared by the cells that use it.
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Avg GFC Comparison")
     
     header_fill = PatternFill(start_color="0000FF", end_color="0000FF", fill_type="solid")
     header_font = Font(name="Inter", color="FFFFFF", bold=True, size=11)
@@ -93,6 +109,7 @@ def export_to_excel(paths: ScenarioPaths, current_data: Dict[str, Any], spec: Di
     cell_font = Font(name="Inter", size=10)
     cell_alignment = Alignment(horizontal="center", vertical="center")
     left_alignment = Alignment(horizontal="left", vertical="center", indent=2)
+    group_alignment = Alignment(horizontal="left", vertical="center")
     
     border = Border(
         left=Side(style="dashed", color="CCCCCC"),
@@ -111,106 +128,96 @@ def export_to_excel(paths: ScenarioPaths, current_data: Dict[str, Any], spec: Di
         bottom=Side(style="dashed", color="CCCCCC"),
     )
     
+    # Cells a group merge covers below its name keep only the name cell's
+    # right edge, plus its bottom edge on the last row, as merge_cells would.
+    merged_border = Border(right=Side(style="dashed", color="CCCCCC"))
+    merged_bottom_border = Border(
+        right=Side(style="dashed", color="CCCCCC"),
+        bottom=Side(style="dashed", color="CCCCCC"),
+    )
+    
+    def styled_cell(
+        value: str | None,
+        font: Font | None = None,
+        alignment: Alignment | None = None,
+        cell_border: Border | None = None,
+        fill: PatternFill | None = None,
+    ) -> WriteOnlyCell:
+        cell = WriteOnlyCell(ws, value=value)
+        if font:
+            cell.font = font
+        if alignment:
+            cell.alignment = alignment
+        if cell_border:
+            cell.border = cell_border
+        if fill:
+            cell.fill = fill
+        return cell
+    
     scenario_name = spec.get("scenario_name", "CCAR 2025 (SA)")
     headers = ["", "Factor", scenario_name, "CCAR Avg.\n(2019-2025)", "GFC Shock", 
                 "Relative to CCAR\nAvg", "Relative to GFC"]
     
+    # Dimensions must be in place before the first row is streamed out.
+    for letter, width in zip("ABCDEFG", (16, 18, 16, 16, 16, 18, 18)):
+        ws.column_dimensions[letter].width = width
+    
+    ws.row_dimensions[1].height = 35
+    
+    header_row = []
     for col_idx, header in enumerate(headers, start=1):
-        cell = ws.cell(row=1, column=col_idx, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
         if col_idx == 1:
-            cell.border = border_left
+            header_border = border_left
         elif col_idx == len(headers):
-            cell.border = border_right
+            header_border = border_right
         else:
-            cell.border = border
+            header_border = border
+        header_row.append(styled_cell(header, header_font, header_alignment, header_border, header_fill))
+    ws.append(header_row)
     
     row_idx = 2
     
     for group_spec in spec["factor_groups"]:
         group_name = group_spec["group"]
         factors = group_spec["factors"]
-        
-        group_start_row = row_idx
+        # Write-only sheets take merges as ranges, registered up front.
+        if len(factors) > 1:
+            ws.merged_cells.add(f"A{row_idx}:A{row_idx + len(factors) - 1}")
         
         for factor_idx, factor_spec in enumerate(factors):
             factor_name = factor_spec["name"]
             source = factor_spec["source"]
-            template = factor_spec.get("template", "{value}")
+            # Bind the template's format method once for the three value cells.
+            render = factor_spec.get("template", "{value}").format
             
-            cell = ws.cell(row=row_idx, column=1, value=group_name if factor_idx == 0 else "")
-            cell.font = group_font
-            cell.alignment = Alignment(horizontal="left", vertical="center")
-            cell.border = border_left
+            if factor_idx == 0:
+                row = [styled_cell(group_name, group_font, group_alignment, border_left)]
+            else:
+                # A later row implies several factors, so column A is merged here.
+                last = factor_idx == len(factors) - 1
+                row = [styled_cell(None, cell_border=merged_bottom_border if last else merged_border)]
             
-            cell = ws.cell(row=row_idx, column=2, value=factor_name)
-            cell.font = factor_font
-            cell.alignment = left_alignment
-            cell.border = border
+            row.append(styled_cell(factor_name, factor_font, left_alignment, border))
             
             current_val = current_data.get(source)
-            if current_val is not None:
-                display = template.format(value=current_val)
-            else:
-                display = ""
-            cell = ws.cell(row=row_idx, column=3, value=display)
-            cell.font = cell_font
-            cell.alignment = cell_alignment
-            cell.border = border
-            
             avg_val = ccar_avg_data.get(source)
-            if avg_val is not None:
-                display = template.format(value=avg_val)
-            else:
-                display = ""
-            cell = ws.cell(row=row_idx, column=4, value=display)
-            cell.font = cell_font
-            cell.alignment = cell_alignment
-            cell.border = border
-            
             gfc_val = gfc_data.get(source)
-            if gfc_val is not None:
-                display = template.format(value=gfc_val)
-            else:
-                display = ""
-            cell = ws.cell(row=row_idx, column=5, value=display)
-            cell.font = cell_font
-            cell.alignment = cell_alignment
-            cell.border = border
+            for value in (current_val, avg_val, gfc_val):
+                display = render(value=value) if value is not None else ""
+                row.append(styled_cell(display, cell_font, cell_alignment, border))
             
+            avg_fill = None
             if current_val is not None and avg_val is not None:
-                cell = ws.cell(row=row_idx, column=6, value="")
-                cell.fill = get_color_for_abs_comparison(current_val, avg_val, heatmap_colors)
-                cell.border = border
-            else:
-                cell = ws.cell(row=row_idx, column=6, value="")
-                cell.border = border
+                avg_fill = get_color_for_abs_comparison(current_val, avg_val, green_fill, red_fill)
+            row.append(styled_cell("", cell_border=border, fill=avg_fill))
             
+            gfc_fill = None
             if current_val is not None and gfc_val is not None:
-                cell = ws.cell(row=row_idx, column=7, value="")
-                cell.fill = get_color_for_abs_comparison(current_val, gfc_val, heatmap_colors)
-                cell.border = border_right
-            else:
-                cell = ws.cell(row=row_idx, column=7, value="")
-                cell.border = border_right
+                gfc_fill = get_color_for_abs_comparison(current_val, gfc_val, green_fill, red_fill)
+            row.append(styled_cell("", cell_border=border_right, fill=gfc_fill))
             
+            ws.append(row)
             row_idx += 1
-        
-        if len(factors) > 1:
-            ws.merge_cells(start_row=group_start_row, start_column=1, 
-                          end_row=row_idx - 1, end_column=1)
-    
-    ws.column_dimensions['A'].width = 16
-    ws.column_dimensions['B'].width = 18
-    ws.column_dimensions['C'].width = 16
-    ws.column_dimensions['D'].width = 16
-    ws.column_dimensions['E'].width = 16
-    ws.column_dimensions['F'].width = 18
-    ws.column_dimensions['G'].width = 18
-    
-    ws.row_dimensions[1].height = 35
     
     output_path = paths.artifacts_dir / "table_vs_avg_gfc.xlsx"
     output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -219,16 +226,18 @@ def export_to_excel(paths: ScenarioPaths, current_data: Dict[str, Any], spec: Di
 
 
 def main() -> None:
-    paths = ScenarioPaths()
+    paths = get_paths()
     spec = load_spec(paths)
-    table = build_table(paths)
+    sources = [factor["source"] for group in spec["factor_groups"] for factor in group["factors"]]
+    summary = load_summary(paths, sources)
+    table = build_table(spec, summary)
     
     scenario_name = spec.get("scenario_name", "CCAR 2025 (SA)")
     output = {scenario_name: table}
     
     output_path = paths.current_dir / "table_vs_avg_gfc.json"
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(json.dumps(output, indent=2))
+    write_json(output, output_path)
     print(f"Saved JSON -> {output_path}")
     
     export_to_excel(paths, table, spec)
@@ -19,55 +19,26 @@ Computed values are marked with `[computed]` after the value and its unit.
 
 from __future__ import annotations
 
-import json
-import re
-from typing import Any, Dict, List
+from typing import Any, Dict, TextIO
 
-from paths import ScenarioPaths
-
-
-# Marker for computed values
-COMPUTED_MARKER = "`[computed]`"
+from io_utils import read_json
+from paths import ScenarioPaths, get_paths
+from templates import COMPUTED_MARKER, compile_template, get_field_value
 
 
 def load_spec(paths: ScenarioPaths) -> Dict[str, Any]:
-    return json.loads(paths.key_commentary_config.read_text())
+    return read_json(paths.key_commentary_config)
 
 
 def load_shock_data(paths: ScenarioPaths) -> Dict[str, Dict[str, Any]]:
-    return json.loads(paths.shock_data_json.read_text())
+    return read_json(paths.shock_data_json)
 
 
 def load_t0_data(paths: ScenarioPaths) -> Dict[str, float]:
-    data = json.loads(paths.t0_json.read_text())
+    data = read_json(paths.t0_json)
     return data.get("factors", {})
 
 
-def get_field_value(
-    factor: str,
-    field: str,
-    shock_data: Dict[str, Dict[str, Any]],
-    t0_data: Dict[str, float],
-) -> float | None:
-    """Extract a field value for a given factor."""
-    entry = shock_data.get(factor, {})
-    
-    if field == "shock":
-        return entry.get("shock_value")
-    elif field == "shock_abs":
-        val = entry.get("shock_value")
-        return abs(val) if val is not None else None
-    elif field == "shock_bps":
-        val = entry.get("shock_value")
-        return abs(val) * 100 if val is not None else None
-    elif field == "extreme":
-        return entry.get("extreme_value")
-    elif field == "t0":
-        return t0_data.get(factor)
-    
-    return None
-
-
 def render_template(
     template: str,
     shock_data: Dict[str, Dict[str, Any]],
@@ -78,49 +49,59 @@ def render_template(
     Replace placeholders like {Factor.field:.1f} with actual values.
     Also captures trailing unit (%, bps, ppts) to place marker after it.
     """
-    pattern = r'\{([^.}]+)\.([a-z_]+)(?::([^}]+))?\}(%|bps|ppts|pts)?'
+    # Static prose has nothing to substitute.
+    if "{" not in template:
+        return template
+    
+    marker = f" {COMPUTED_MARKER}" if add_marker else ""
+    parts: list[str] = []
     
-    def replacer(match: re.Match) -> str:
-        factor = match.group(1)
-        field = match.group(2)
-        fmt_spec = match.group(3) or ""
-        unit = match.group(4) or ""
+    for segment in compile_template(template):
+        if isinstance(segment, str):
+            parts.append(segment)
+            continue
+        
+        is_baseline, factor, field, fmt_spec, unit = segment
+        if is_baseline:
+            # Baseline tokens only mean something on the summary page; leave them as written.
+            fmt_part = f":{fmt_spec}" if fmt_spec else ""
+            parts.append(f"{{baseline.{factor}.{field}{fmt_part}}}{unit}")
+            continue
         
         value = get_field_value(factor, field, shock_data, t0_data)
         
         if value is None:
-            return f"[{factor}.{field}:N/A]"
+            parts.append(f"[{factor}.{field}:N/A]")
+            continue
         
         if fmt_spec:
             formatted = format(value, fmt_spec)
         else:
             formatted = str(value)
         
-        if add_marker:
-            return f"{formatted}{unit} {COMPUTED_MARKER}"
-        return f"{formatted}{unit}"
+        parts.append(f"{formatted}{unit}{marker}")
     
-    return re.sub(pattern, replacer, template)
+    return "".join(parts)
 
 
 def build_markdown(
     spec: Dict[str, Any],
     shock_data: Dict[str, Dict[str, Any]],
     t0_data: Dict[str, float],
-) -> str:
-    """Build the markdown output."""
-    lines: List[str] = []
+    out: TextIO,
+) -> None:
+    """Write the markdown output to ``out``."""
+    write = out.write
     
     # Check if computed marker should be shown (default: False)
     show_marker = spec.get("show_computed_marker", False)
     
     title = spec.get("title", "Key Factor Shocks")
-    lines.append(f"# {title}")
-    lines.append("")
+    write(f"# {title}\n")
     
+    # Each block opens with the blank line that separates it from the last one.
     for category in spec.get("categories", []):
-        lines.append(f"## {category['name']}")
-        lines.append("")
+        write(f"\n## {category['name']}\n\n")
         
         for bullet in category.get("bullets", []):
             # Auto-detect type: if template exists, it's computed; otherwise use text
@@ -129,25 +110,21 @@ def build_markdown(
             else:
                 text = bullet.get("text", "")
             
-            lines.append(f"- {text}")
-        
-        lines.append("")
-    
-    return "\n".join(lines)
+            write(f"- {text}\n")
 
 
 def main() -> None:
-    paths = ScenarioPaths()
+    paths = get_paths()
     spec = load_spec(paths)
     
     shock_data = load_shock_data(paths)
     t0_data = load_t0_data(paths)
     
-    markdown = build_markdown(spec, shock_data, t0_data)
-    
     output_path = paths.key_commentary_md
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(markdown)
+    # Rendered text goes straight into the file's write buffer.
+    with output_path.open("w", buffering=1 << 20) as out:
+        build_markdown(spec, shock_data, t0_data, out)
     print(f"Saved → {output_path}")
 
 
@@ -19,210 +19,235 @@ Computed values are marked with `[computed]` after the value and its unit.
 
 from __future__ import annotations
 
-import json
-import re
-from typing import Any, Dict, List
+from typing import Any, Dict, TextIO
 
+import numpy as np
 import pandas as pd
 
-from paths import ScenarioPaths
+from io_utils import parquet_sibling, read_frame, read_json
+from paths import ScenarioPaths, get_paths
+from templates import COMPUTED_MARKER, compile_template, get_field_value
 
+try:
+    from numba import njit  # type: ignore[import-untyped]
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
-# Marker for computed values
-COMPUTED_MARKER = "`[computed]`"
+
+DATE_COLUMN = "Date"
 
 
 def load_spec(paths: ScenarioPaths) -> Dict[str, Any]:
-    return json.loads(paths.summary_config.read_text())
+    return read_json(paths.summary_config)
 
 
 def load_shock_data(paths: ScenarioPaths) -> Dict[str, Dict[str, Any]]:
-    return json.loads(paths.shock_data_json.read_text())
+    return read_json(paths.shock_data_json)
 
 
 def load_t0_data(paths: ScenarioPaths) -> Dict[str, float]:
-    data = json.loads(paths.t0_json.read_text())
+    data = read_json(paths.t0_json)
     return data.get("factors", {})
 
 
 def load_baseline_data(paths: ScenarioPaths) -> pd.DataFrame:
-    return pd.read_csv(paths.path_baseline_csv)
+    return read_frame(paths.path_baseline_csv, parquet_sibling(paths.path_baseline_csv))
 
 
-def get_shock_field_value(
-    factor: str,
-    field: str,
-    shock_data: Dict[str, Dict[str, Any]],
-    t0_data: Dict[str, float],
-) -> float | None:
-    """Extract a field value for SA shock data."""
-    entry = shock_data.get(factor, {})
-    
-    if field == "shock":
-        return entry.get("shock_value")
-    elif field == "shock_abs":
-        val = entry.get("shock_value")
-        return abs(val) if val is not None else None
-    elif field == "shock_bps":
-        val = entry.get("shock_value")
-        return abs(val) * 100 if val is not None else None
-    elif field == "extreme":
-        return entry.get("extreme_value")
-    elif field == "t0":
-        return t0_data.get(factor)
-    
-    return None
+def _column_aggregates(block: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """One pass down each column of ``block`` for its non-NaN max, min, first and last.
+
+    Returns a (4, n_cols) array in that order plus a mask of columns with any
+    value. Meant for a column-major block; compiled by numba when available.
+    """
+    n_rows, n_cols = block.shape
+    stats = np.full((4, n_cols), np.nan)
+    present = np.zeros(n_cols, dtype=np.bool_)
+    for j in range(n_cols):
+        for i in range(n_rows):
+            value = block[i, j]
+            if value != value:
+                continue
+            if not present[j]:
+                present[j] = True
+                stats[0, j] = value
+                stats[1, j] = value
+                stats[2, j] = value
+            else:
+                if value > stats[0, j]:
+                    stats[0, j] = value
+                if value < stats[1, j]:
+                    stats[1, j] = value
+            stats[3, j] = value
+    return stats, present
+
+
+if NUMBA_AVAILABLE:
+    _column_aggregates = njit(cache=True)(_column_aggregates)
+
+
+def compute_baseline_aggregates(baseline_df: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+    """Every supported aggregate of each numeric baseline column, in one sweep over the frame.
+
+    Columns with no numeric values are left out, so their placeholders read N/A.
+    """
+    # read_frame already delivers parsed factor columns as float64, and the
+    # 'YYYY Qn' Date labels never coerce to numbers, so drop Date and only
+    # coerce whatever text columns remain, in one block.
+    factors = baseline_df.drop(columns=[DATE_COLUMN], errors="ignore")
+    to_coerce = [
+        column
+        for column, dtype in factors.dtypes.items()
+        if not pd.api.types.is_numeric_dtype(dtype)
+    ]
+    numeric = factors.assign(
+        **{column: pd.to_numeric(factors[column], errors="coerce") for column in to_coerce}
+    )
+    block = numeric.to_numpy(dtype=np.float64)
+    if block.shape[0] == 0:
+        return {}
+    
+    if NUMBA_AVAILABLE:
+        stats, present = _column_aggregates(np.asfortranarray(block))
+        highs, lows, firsts, lasts = stats
+    else:
+        # first/last are the first and last non-missing value, as after dropna().
+        valid = ~np.isnan(block)
+        positions = np.arange(block.shape[1])
+        present = valid.any(axis=0)
+        highs = numeric.max().to_numpy()
+        lows = numeric.min().to_numpy()
+        firsts = block[valid.argmax(axis=0), positions]
+        lasts = block[block.shape[0] - 1 - valid[::-1].argmax(axis=0), positions]
+    # The mean stays with pandas' pairwise summation, so results match to the last bit.
+    means = numeric.mean().to_numpy()
+    
+    columns = zip(
+        numeric.columns,
+        present.tolist(),
+        highs.tolist(),
+        lows.tolist(),
+        firsts.tolist(),
+        lasts.tolist(),
+        means.tolist(),
+    )
+    return {
+        column: {"max": high, "min": low, "first": first, "last": last, "mean": mean}
+        for column, present, high, low, first, last, mean in columns
+        if present
+    }
 
 
 def get_baseline_field_value(
     factor: str,
     agg: str,
-    baseline_df: pd.DataFrame,
+    baseline_aggs: Dict[str, Dict[str, float]],
 ) -> float | None:
-    """Extract aggregated value from baseline path data."""
-    if factor not in baseline_df.columns:
-        return None
-    
-    series = pd.to_numeric(baseline_df[factor], errors="coerce").dropna()
-    if series.empty:
-        return None
-    
-    if agg == "max":
-        return float(series.max())
-    elif agg == "min":
-        return float(series.min())
-    elif agg == "first":
-        return float(series.iloc[0])
-    elif agg == "last":
-        return float(series.iloc[-1])
-    elif agg == "mean":
-        return float(series.mean())
-    
-    return None
+    """Look up a precomputed aggregate of the baseline path."""
+    return baseline_aggs.get(factor, {}).get(agg)
 
 
 def render_template(
     template: str,
     shock_data: Dict[str, Dict[str, Any]],
     t0_data: Dict[str, float],
-    baseline_df: pd.DataFrame,
+    baseline_aggs: Dict[str, Dict[str, float]],
     add_marker: bool = True,
 ) -> str:
     """
     Replace placeholders with actual values.
     Also captures trailing unit (%, bps, ppts) to place marker after it.
     """
-    marker = f" {COMPUTED_MARKER}" if add_marker else ""
+    # Static prose has nothing to substitute.
+    if "{" not in template:
+        return template
     
-    baseline_pattern = r'\{baseline\.([^.}]+)\.([a-z]+)(?::([^}]+))?\}(%|bps|ppts|pts)?'
+    marker = f" {COMPUTED_MARKER}" if add_marker else ""
+    parts: list[str] = []
     
-    def baseline_replacer(match: re.Match) -> str:
-        factor = match.group(1)
-        agg = match.group(2)
-        fmt_spec = match.group(3) or ""
-        unit = match.group(4) or ""
-        
-        value = get_baseline_field_value(factor, agg, baseline_df)
+    for segment in compile_template(template):
+        if isinstance(segment, str):
+            parts.append(segment)
+            continue
         
-        if value is None:
-            return f"[baseline.{factor}.{agg}:N/A]"
-        
-        if fmt_spec:
-            formatted = format(value, fmt_spec)
+        is_baseline, factor, field, fmt_spec, unit = segment
+        if is_baseline:
+            value = get_baseline_field_value(factor, field, baseline_aggs)
+            if value is None:
+                parts.append(f"[baseline.{factor}.{field}:N/A]")
+                continue
         else:
-            formatted = str(value)
-        
-        return f"{formatted}{unit}{marker}"
-    
-    result = re.sub(baseline_pattern, baseline_replacer, template)
-    
-    shock_pattern = r'\{([^.}]+)\.([a-z_]+)(?::([^}]+))?\}(%|bps|ppts|pts)?'
-    
-    def shock_replacer(match: re.Match) -> str:
-        factor = match.group(1)
-        field = match.group(2)
-        fmt_spec = match.group(3) or ""
-        unit = match.group(4) or ""
-        
-        value = get_shock_field_value(factor, field, shock_data, t0_data)
-        
-        if value is None:
-            return f"[{factor}.{field}:N/A]"
+            value = get_field_value(factor, field, shock_data, t0_data)
+            if value is None:
+                parts.append(f"[{factor}.{field}:N/A]")
+                continue
         
         if fmt_spec:
             formatted = format(value, fmt_spec)
         else:
             formatted = str(value)
         
-        return f"{formatted}{unit}{marker}"
-    
-    result = re.sub(shock_pattern, shock_replacer, result)
+        parts.append(f"{formatted}{unit}{marker}")
     
-    return result
+    return "".join(parts)
 
 
 def build_markdown(
     spec: Dict[str, Any],
     shock_data: Dict[str, Dict[str, Any]],
     t0_data: Dict[str, float],
-    baseline_df: pd.DataFrame,
-) -> str:
-    """Build the markdown output."""
-    lines: List[str] = []
+    baseline_aggs: Dict[str, Dict[str, float]],
+    out: TextIO,
+) -> None:
+    """Write the markdown output to ``out``."""
+    write = out.write
     
     # Check if computed marker should be shown (default: False)
     show_marker = spec.get("show_computed_marker", False)
     
     title = spec.get("title", "Summary")
-    lines.append(f"# {title}")
-    lines.append("")
+    write(f"# {title}\n\n")
     
     release_date = spec.get("release_date", "")
     scenario_year = spec.get("scenario_year", "")
-    lines.append(f"On {release_date}, the FRB released the CCAR {scenario_year} Supervisory scenarios.")
-    lines.append("")
+    write(f"On {release_date}, the FRB released the CCAR {scenario_year} Supervisory scenarios.\n")
     
+    # Each block opens with the blank line that separates it from the last one.
     for section in spec.get("sections", []):
-        lines.append(f"## {section['name']}")
-        lines.append("")
+        write(f"\n## {section['name']}\n\n")
         
         description = section.get("description")
         if description:
-            lines.append(f"*{description}*")
-            lines.append("")
+            write(f"*{description}*\n\n")
         
         for bullet in section.get("bullets", []):
             # Auto-detect type: if template exists, it's computed; otherwise use text
             if "template" in bullet:
-                text = render_template(bullet["template"], shock_data, t0_data, baseline_df, add_marker=show_marker)
+                text = render_template(bullet["template"], shock_data, t0_data, baseline_aggs, add_marker=show_marker)
             else:
                 text = bullet.get("text", "")
             
-            lines.append(f"- {text}")
+            write(f"- {text}\n")
         
         footnote = section.get("footnote")
         if footnote:
-            lines.append("")
-            lines.append(f"> {footnote}")
-        
-        lines.append("")
-    
-    return "\n".join(lines)
+            write(f"\n> {footnote}\n")
 
 
 def main() -> None:
-    paths = ScenarioPaths()
+    paths = get_paths()
     spec = load_spec(paths)
     
     shock_data = load_shock_data(paths)
     t0_data = load_t0_data(paths)
-    baseline_df = load_baseline_data(paths)
-    
-    markdown = build_markdown(spec, shock_data, t0_data, baseline_df)
+    baseline_aggs = compute_baseline_aggregates(load_baseline_data(paths))
     
     output_path = paths.summary_md
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(markdown)
+    # Rendered text goes straight into the file's write buffer.
+    with output_path.open("w", buffering=1 << 20) as out:
+        build_markdown(spec, shock_data, t0_data, baseline_aggs, out)
     print(f"Saved → {output_path}")
 
 
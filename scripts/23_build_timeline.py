@@ -7,66 +7,71 @@ Calculates milestone dates based on release_date (Day 1) and day_offset values.
 
 from __future__ import annotations
 
-import json
+import os
 from datetime import datetime, timedelta
-from typing import Any, Dict, List
+from typing import Any, Dict, TextIO
 
-from paths import ScenarioPaths
+from io_utils import read_json
+from paths import ScenarioPaths, get_paths
+
+
+# Day of month without a leading zero: glibc/BSD use %-d, Windows %#d.
+DATE_FORMAT = "%A, %B %#d" if os.name == "nt" else "%A, %B %-d"
 
 
 def load_spec(paths: ScenarioPaths) -> Dict[str, Any]:
     spec_path = paths.md_config_dir / "timeline.json"
-    return json.loads(spec_path.read_text())
+    return read_json(spec_path)
 
 
 def format_date(date: datetime) -> str:
     """Format date as 'Saturday, February 8'."""
-    return date.strftime("%A, %B %d").replace(" 0", " ")
+    return date.strftime(DATE_FORMAT)
 
 
-def build_markdown(spec: Dict[str, Any]) -> str:
-    """Build the markdown output."""
-    lines: List[str] = []
+def build_markdown(spec: Dict[str, Any], out: TextIO) -> None:
+    """Write the markdown output to ``out``."""
+    write = out.write
     
     title = spec.get("title", "Timeline")
-    lines.append(f"# {title}")
-    lines.append("")
+    write(f"# {title}\n\n")
     
     # Intro bullets
     for bullet in spec.get("intro_bullets", []):
-        lines.append(f"- {bullet}")
-    lines.append("")
+        write(f"- {bullet}\n")
+    write("\n")
     
     # Parse release date (Day 1)
     release_date_str = spec.get("release_date", "")
-    release_date = datetime.strptime(release_date_str, "%Y-%m-%d")
+    release_date = datetime.fromisoformat(release_date_str)
+    
+    milestones = spec.get("milestones", [])
+    
+    # Format each distinct target date once; milestones often share an offset
+    offsets = {milestone.get("day_offset", 0) for milestone in milestones}
+    formatted_dates = {
+        offset: format_date(release_date + timedelta(days=offset)) for offset in offsets
+    }
     
     # Generate milestone list
-    for idx, milestone in enumerate(spec.get("milestones", []), start=1):
+    for idx, milestone in enumerate(milestones, start=1):
         day_offset = milestone.get("day_offset", 0)
         description = milestone.get("description", "")
         
-        # Calculate target date
-        target_date = release_date + timedelta(days=day_offset)
-        formatted_date = format_date(target_date)
-        
         # Replace {date} placeholder
-        text = description.format(date=formatted_date)
-        lines.append(f"{idx}. {text}")
-    
-    lines.append("")
-    return "\n".join(lines)
+        text = description.format(date=formatted_dates[day_offset])
+        write(f"{idx}. {text}\n")
 
 
 def main() -> None:
-    paths = ScenarioPaths()
+    paths = get_paths()
     spec = load_spec(paths)
     
-    markdown = build_markdown(spec)
-    
     output_path = paths.artifacts_dir / "timeline.md"
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(markdown)
+    # Rendered text goes straight into the file's write buffer.
+    with output_path.open("w", buffering=1 << 20) as out:
+        build_markdown(spec, out)
     print(f"Saved → {output_path}")
 
 
@@ -0,0 +1,263 @@
+"""
+Shared file I/O helpers for the pipeline scripts.
+
+Usage:
+    from io_utils import parquet_sibling, read_csv, read_frame, read_json, read_json_items, write_csv, write_json
+
+    df = read_csv(paths.path_sa_csv)    # parsed by pyarrow when it is installed
+    write_csv(df, paths.path_sa_csv)    # later reads in this process reuse df
+    write_csv(df, csv_path, parquet_path=parquet_sibling(csv_path))
+    df = read_frame(csv_path, parquet_sibling(csv_path))  # no CSV parse
+    payload = read_json(paths.t0_json)  # parsed by orjson when it is installed
+    entries = read_json_items(history_path, ["ccar_avg", "gfc"])  # streamed by ijson
+    write_json(payload, paths.t0_json)  # same bytes with or without orjson
+
+When stages run in one interpreter (see run_all.py), a frame written with
+``write_csv`` is handed to the next ``read_csv`` of the same file instead of
+being parsed again, as long as the file on disk has not changed since.
+JSON is not cached: a fresh orjson parse of these small files is cheaper
+than handing out a defensive copy of a cached one.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq  # type: ignore[import-untyped]
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import orjson  # type: ignore[import-untyped]
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson  # type: ignore[import-untyped]
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+
+# path -> ((mtime_ns, size) at write time, frame as it would read back)
+_WRITTEN_FRAMES: Dict[Path, Tuple[Tuple[int, int], pd.DataFrame]] = {}
+
+
+def _file_signature(path: Path) -> Tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _written_frame(path: Path, columns: set[str] | None = None) -> pd.DataFrame | None:
+    """Copy of the frame last written to ``path`` (optionally just ``columns``), if still current."""
+    if path in _WRITTEN_FRAMES:
+        signature, frame = _WRITTEN_FRAMES[path]
+        if signature == _file_signature(path):
+            if columns is None:
+                return frame.copy()
+            # Column selection already yields a new frame; no second copy needed.
+            return frame[[column for column in frame.columns if column in columns]]
+    return None
+
+
+def read_csv(path: Path, **kwargs: Any) -> pd.DataFrame:
+    """Read a CSV with pandas' multithreaded pyarrow engine, falling back to the C parser."""
+    if not kwargs:
+        frame = _written_frame(path)
+        if frame is not None:
+            return frame
+
+    if not PYARROW_AVAILABLE:
+        return pd.read_csv(path, **kwargs)
+
+    usecols = kwargs.get("usecols")
+    if callable(usecols):
+        # The pyarrow engine only accepts an explicit column list.
+        header = pd.read_csv(path, nrows=0).columns
+        kwargs["usecols"] = [column for column in header if usecols(column)]
+
+    return pd.read_csv(path, engine="pyarrow", **kwargs)
+
+
+def parquet_sibling(path: Path) -> Path:
+    """Where ``write_csv``/``read_frame`` keep the Parquet copy of a CSV."""
+    return path.with_suffix(".parquet")
+
+
+def read_frame(
+    path: Path,
+    parquet_path: Path | None = None,
+    columns: Iterable[str] | None = None,
+) -> pd.DataFrame:
+    """Read the CSV at ``path``, loading its Parquet copy instead when that is not older.
+
+    With ``columns``, only those of them present in the file are loaded (in file
+    order); callers report any that are missing.
+    """
+    wanted = None if columns is None else set(columns)
+
+    frame = _written_frame(path, wanted)
+    if frame is not None:
+        return frame
+
+    if (
+        PYARROW_AVAILABLE
+        and parquet_path is not None
+        and parquet_path.exists()
+        and parquet_path.stat().st_mtime_ns >= path.stat().st_mtime_ns
+    ):
+        present = None
+        if wanted is not None:
+            present = [name for name in pq.read_schema(parquet_path).names if name in wanted]
+        return pd.read_parquet(parquet_path, engine="pyarrow", columns=present)
+
+    if wanted is None:
+        return read_csv(path)
+    return read_csv(path, usecols=lambda column: column in wanted)
+
+
+def write_csv(df: pd.DataFrame, path: Path, parquet_path: Path | None = None) -> None:
+    """Write ``df`` without its index and keep it for later reads in this process.
+
+    With ``parquet_path`` (and pyarrow installed) a Parquet copy is written
+    too, so ``read_frame`` in a later process can skip parsing the CSV.
+    """
+    df.to_csv(path, index=False)
+    _WRITTEN_FRAMES[path] = (_file_signature(path), df.reset_index(drop=True))
+    if parquet_path is not None and PYARROW_AVAILABLE:
+        df.to_parquet(parquet_path, engine="pyarrow", compression="zstd", index=False)
+
+
+def read_json(path: Path) -> Any:
+    """Parse a JSON file, with orjson when it is installed."""
+    # Both parsers take the raw bytes, so the file is never decoded to str first.
+    data = path.read_bytes()
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+def read_json_items(path: Path, keys: Iterable[str]) -> Dict[str, Any]:
+    """Top-level entries of the JSON object at ``path`` whose key is in ``keys``, in file order.
+
+    With ijson installed, the file is streamed entry by entry and only the
+    wanted ones are kept, so the rest never sit in memory together.
+    """
+    wanted = set(keys)
+    if not IJSON_AVAILABLE:
+        return {key: value for key, value in read_json(path).items() if key in wanted}
+
+    with path.open("rb") as fh:
+        return {
+            key: value
+            for key, value in ijson.kvitems(fh, "", use_float=True)
+            if key in wanted
+        }
+
+
+def _float_text(value: float, shortest: str, positional: Tuple[int, int]) -> str:
+    """Spell a finite float as orjson does, from its ``shortest`` round-trip digits.
+
+    orjson writes plain decimals while the decimal exponent is within
+    ``positional`` and ``1.5e16``-style (no '+', no padding) outside it.
+    """
+    if value == 0:
+        return shortest  # '0.0' or '-0.0'
+    sign = "-" if shortest.startswith("-") else ""
+    text = shortest.lstrip("-")
+    if "e" in text:
+        mantissa, exponent = text.split("e")
+        digits, power = mantissa.replace(".", ""), int(exponent)
+    else:
+        whole, fraction = text.split(".")
+        if whole != "0":
+            digits, power = whole + fraction, len(whole) - 1
+        else:
+            significant = fraction.lstrip("0")
+            digits, power = significant, len(significant) - len(fraction) - 1
+    digits = digits.rstrip("0") or "0"
+
+    low, high = positional
+    if not low <= power <= high:
+        mantissa = digits[0] + (f".{digits[1:]}" if len(digits) > 1 else "")
+        return f"{sign}{mantissa}e{power}"
+    if power < 0:
+        return f"{sign}0.{'0' * (-power - 1)}{digits}"
+    whole = digits[: power + 1].ljust(power + 1, "0")
+    return f"{sign}{whole}.{digits[power + 1:] or '0'}"
+
+
+def _iter_json(obj: Any, indent: str = "") -> Iterator[str]:
+    """Chunks of ``obj`` as JSON in orjson's OPT_INDENT_2 layout (the fallback writer)."""
+    if isinstance(obj, np.ndarray):
+        # float32 elements stay NumPy scalars so they keep their own digits.
+        obj = list(obj) if obj.dtype == np.float32 else obj.tolist()
+    elif isinstance(obj, np.float32):
+        # orjson writes float32 with its own shortest digits ('0.1', not
+        # '0.10000000149011612') and a narrower positional range.
+        yield _float_text(float(obj), str(obj), (-6, 12)) if np.isfinite(obj) else "null"
+        return
+    elif isinstance(obj, np.generic):
+        obj = obj.item()
+
+    if obj is None:
+        yield "null"
+    elif obj is True:
+        yield "true"
+    elif obj is False:
+        yield "false"
+    elif isinstance(obj, str):
+        yield json.dumps(obj, ensure_ascii=False)
+    elif isinstance(obj, int):
+        yield str(int(obj))
+    elif isinstance(obj, float):
+        yield _float_text(obj, repr(obj), (-5, 15)) if np.isfinite(obj) else "null"
+    elif isinstance(obj, dict):
+        if not obj:
+            yield "{}"
+            return
+        inner = indent + "  "
+        separator = "{\n"
+        for key, value in obj.items():
+            if not isinstance(key, str):
+                raise TypeError("Dict key must be str")
+            yield f"{separator}{inner}{json.dumps(key, ensure_ascii=False)}: "
+            yield from _iter_json(value, inner)
+            separator = ",\n"
+        yield f"\n{indent}}}"
+    elif isinstance(obj, (list, tuple)):
+        if not obj:
+            yield "[]"
+            return
+        inner = indent + "  "
+        separator = "[\n"
+        for value in obj:
+            yield f"{separator}{inner}"
+            yield from _iter_json(value, inner)
+            separator = ",\n"
+        yield f"\n{indent}]"
+    else:
+        raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def write_json(obj: Any, path: Path) -> None:
+    """Write ``obj`` as UTF-8 JSON indented by two spaces; NumPy scalars and arrays are allowed.
+
+    The bytes do not depend on whether orjson is installed: without it, a
+    small writer reproduces orjson's output (non-ASCII text as-is, NaN and
+    inf as null, orjson's float spelling).
+    """
+    if ORJSON_AVAILABLE:
+        path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        return
+
+    # Stream the chunks straight into the file instead of building the whole
+    # document as one string.
+    with path.open("w", encoding="utf-8", newline="") as fh:
+        fh.writelines(_iter_json(obj))
@@ -2,9 +2,10 @@
 Centralized path management for scenario-based data processing.
 
 Usage:
-    from paths import ScenarioPaths
+    from paths import ScenarioPaths, get_paths
     
     paths = ScenarioPaths("2025")
+    paths = get_paths()       # shared instance for the FRB_SCENARIO scenario
     paths.source_dir          # data/2025/source/
     paths.intermediate_dir    # data/2025/intermediate/
     paths.artifacts_dir       # artifacts/2025/
@@ -14,127 +15,175 @@ Usage:
 from __future__ import annotations
 
 import os
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Any, ClassVar, Iterable, Optional
 
-PROJECT_ROOT = Path(__file__).resolve().parent.parent
+# abspath needs no per-component symlink lookups, unlike Path.resolve()
+PROJECT_ROOT = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Shared config (not scenario-specific): one Path object for every instance
+SHARED_CONFIG_DIR = PROJECT_ROOT / "config"
+FACTOR_MAPPING_PATH = SHARED_CONFIG_DIR / "factor_mapping.json"
+SHOCK_CONFIG_PATH = SHARED_CONFIG_DIR / "shock_config.json"
 
 # Environment variable to set default scenario
 ENV_SCENARIO = "FRB_SCENARIO"
 DEFAULT_SCENARIO = "2025"
 
 
+@lru_cache(maxsize=None)
 def get_scenario() -> str:
-    """Get scenario from environment variable or default."""
+    """Get scenario from environment variable or default (read once, then cached)."""
     return os.environ.get(ENV_SCENARIO, DEFAULT_SCENARIO)
 
 
+def reset_scenario_cache() -> None:
+    """Forget the cached scenario so the next lookup re-reads the environment."""
+    get_scenario.cache_clear()
+
+
+def _derived() -> Any:
+    """A path field filled in by ``__post_init__`` rather than passed by callers."""
+    return field(init=False, repr=False, compare=False)
+
+
+def _make_tree(leaves: Iterable[Path]) -> None:
+    """Create ``leaves`` and their ancestors below PROJECT_ROOT, each directory once.
+
+    Shared parents such as data/<scenario> are collected once and made
+    parents-first, instead of every makedirs call walking them again.
+    """
+    unique: set[Path] = set()
+    for leaf in leaves:
+        for d in (leaf, *leaf.parents):
+            if d == PROJECT_ROOT or d in unique:
+                break
+            unique.add(d)
+    for d in sorted(unique, key=lambda d: len(d.parts)):
+        try:
+            os.mkdir(d)
+        except FileExistsError:
+            pass
+
+
+@dataclass(frozen=True, slots=True)
 class ScenarioPaths:
-    """Path resolver for a specific scenario."""
+    """Path resolver for a specific scenario.
+
+    The scenario is fixed at construction, so every path is built once in
+    ``__post_init__`` and read back as a plain slot attribute.
+    """
     
-    def __init__(self, scenario: Optional[str] = None):
-        self.scenario = scenario or get_scenario()
-        self.project_root = PROJECT_ROOT
+    scenario: Optional[str] = None
+    project_root: ClassVar[Path] = PROJECT_ROOT
+    # Scenarios whose directories ensure_dirs has already created in this process
+    _ensured: ClassVar[set[str]] = set()
     
     # === Data paths ===
-    @property
-    def data_dir(self) -> Path:
-        return self.project_root / "data" / self.scenario
-    
-    @property
-    def source_dir(self) -> Path:
-        return self.data_dir / "source"
-    
-    @property
-    def intermediate_dir(self) -> Path:
-        return self.data_dir / "intermediate"
-    
-    @property
-    def current_dir(self) -> Path:
-        return self.data_dir / "current"
-    
-    @property
-    def history_dir(self) -> Path:
-        return self.data_dir / "history"
+    data_dir: Path = _derived()
+    source_dir: Path = _derived()
+    intermediate_dir: Path = _derived()
+    current_dir: Path = _derived()
+    history_dir: Path = _derived()
     
     # === Config paths ===
-    @property
-    def config_dir(self) -> Path:
-        return self.project_root / "config" / self.scenario
-    
-    @property
-    def md_config_dir(self) -> Path:
-        return self.config_dir / "md_config"
-    
-    @property
-    def table_config_dir(self) -> Path:
-        return self.config_dir / "table_config"
+    config_dir: Path = _derived()
+    md_config_dir: Path = _derived()
+    table_config_dir: Path = _derived()
     
     # === Shared config (not scenario-specific) ===
-    @property
-    def shared_config_dir(self) -> Path:
-        return self.project_root / "config"
-    
-    @property
-    def factor_mapping_path(self) -> Path:
-        return self.shared_config_dir / "factor_mapping.json"
-    
-    @property
-    def shock_config_path(self) -> Path:
-        return self.shared_config_dir / "shock_config.json"
+    shared_config_dir: Path = _derived()
+    factor_mapping_path: Path = _derived()
+    shock_config_path: Path = _derived()
     
     # === Artifacts paths ===
-    @property
-    def artifacts_dir(self) -> Path:
-        return self.project_root / "artifacts" / self.scenario
+    artifacts_dir: Path = _derived()
     
     # === Intermediate files ===
-    @property
-    def path_baseline_csv(self) -> Path:
-        return self.intermediate_dir / "path_baseline.csv"
-    
-    @property
-    def path_sa_csv(self) -> Path:
-        return self.intermediate_dir / "path_SA.csv"
-    
-    @property
-    def t0_json(self) -> Path:
-        return self.intermediate_dir / "t0.json"
-    
-    @property
-    def shock_data_json(self) -> Path:
-        return self.intermediate_dir / "shock_data.json"
+    path_baseline_csv: Path = _derived()
+    path_sa_csv: Path = _derived()
+    path_sa_parquet: Path = _derived()
+    t0_json: Path = _derived()
+    shock_data_json: Path = _derived()
     
     # === Config files ===
-    @property
-    def summary_config(self) -> Path:
-        return self.md_config_dir / "summary.json"
-    
-    @property
-    def key_commentary_config(self) -> Path:
-        return self.md_config_dir / "key_commentary.json"
+    summary_config: Path = _derived()
+    key_commentary_config: Path = _derived()
     
     # === Artifact files ===
-    @property
-    def summary_md(self) -> Path:
-        return self.artifacts_dir / "summary.md"
-    
-    @property
-    def key_commentary_md(self) -> Path:
-        return self.artifacts_dir / "key_commentary.md"
+    summary_md: Path = _derived()
+    key_commentary_md: Path = _derived()
+    
+    def __post_init__(self) -> None:
+        scenario = self.scenario or get_scenario()
+        data_dir = PROJECT_ROOT.joinpath("data", scenario)
+        intermediate_dir = data_dir / "intermediate"
+        config_dir = PROJECT_ROOT.joinpath("config", scenario)
+        md_config_dir = config_dir / "md_config"
+        artifacts_dir = PROJECT_ROOT.joinpath("artifacts", scenario)
+        
+        resolved = {
+            "scenario": scenario,
+            "data_dir": data_dir,
+            "source_dir": data_dir / "source",
+            "intermediate_dir": intermediate_dir,
+            "current_dir": data_dir / "current",
+            "history_dir": data_dir / "history",
+            "config_dir": config_dir,
+            "md_config_dir": md_config_dir,
+            "table_config_dir": config_dir / "table_config",
+            "shared_config_dir": SHARED_CONFIG_DIR,
+            "factor_mapping_path": FACTOR_MAPPING_PATH,
+            "shock_config_path": SHOCK_CONFIG_PATH,
+            "artifacts_dir": artifacts_dir,
+            "path_baseline_csv": intermediate_dir / "path_baseline.csv",
+            "path_sa_csv": intermediate_dir / "path_SA.csv",
+            "path_sa_parquet": intermediate_dir / "path_SA.parquet",
+            "t0_json": intermediate_dir / "t0.json",
+            "shock_data_json": intermediate_dir / "shock_data.json",
+            "summary_config": md_config_dir / "summary.json",
+            "key_commentary_config": md_config_dir / "key_commentary.json",
+            "summary_md": artifacts_dir / "summary.md",
+            "key_commentary_md": artifacts_dir / "key_commentary.md",
+        }
+        # Frozen dataclass: assign through object.__setattr__.
+        for name, value in resolved.items():
+            object.__setattr__(self, name, value)
     
     def ensure_dirs(self) -> None:
-        """Create all necessary directories for the scenario."""
-        dirs = [
+        """Create all necessary directories for the scenario (once per process)."""
+        if self.scenario in ScenarioPaths._ensured:
+            return
+        leaves = (
             self.source_dir,
             self.intermediate_dir,
             self.current_dir,
             self.history_dir,
-            self.config_dir,
             self.md_config_dir,
             self.table_config_dir,
             self.artifacts_dir,
-        ]
-        for d in dirs:
-            d.mkdir(parents=True, exist_ok=True)
+        )
+        _make_tree(leaves)
+        ScenarioPaths._ensured.add(self.scenario)
+    
+    @classmethod
+    def clear_ensured_cache(cls) -> None:
+        """Make the next ``ensure_dirs`` call for each scenario check the disk again."""
+        cls._ensured.clear()
+
+
+@lru_cache(maxsize=None)
+def _paths_for(scenario: str) -> ScenarioPaths:
+    return ScenarioPaths(scenario)
+
+
+def get_paths(scenario: Optional[str] = None) -> ScenarioPaths:
+    """Shared ``ScenarioPaths`` for ``scenario`` (default: the environment's).
 
+    Stages chained in one interpreter (see run_all.py) reuse one resolver per
+    scenario. After changing FRB_SCENARIO, call ``reset_scenario_cache()`` so
+    the default follows it.
+    """
+    return _paths_for(scenario or get_scenario())
@@ -0,0 +1,58 @@
+"""
+Quarter-label helpers shared by the preprocessing stages.
+
+Usage:
+    from quarters import DATE_COLUMN, quarter_sort_key, sort_by_date
+
+    df = sort_by_date(df)               # rows ordered by their 'YYYY Qn' Date
+    key = quarter_sort_key(df["Date"])  # 2025 Q3 -> 20253
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+
+DATE_COLUMN = "Date"
+QUARTER_PATTERN = re.compile(r"(?P<year>\d{4})\s*Q(?P<quarter>\d)")
+
+
+@lru_cache(maxsize=8)
+def _label_keys(labels: Tuple[str, ...]) -> np.ndarray:
+    dates = pd.Series(labels)
+    if not dates.str.fullmatch(QUARTER_PATTERN, na=False).all():
+        # Labels with anything around the 'YYYY Qn' part (such as stray
+        # spaces) are searched for it, as the format has always allowed.
+        extracted = dates.str.extract(QUARTER_PATTERN, expand=True)
+        if extracted.isnull().any().any():
+            raise ValueError("Date column must follow the 'YYYY Qn' format.")
+        keys = (extracted["year"].astype(np.int64) * 10 + extracted["quarter"].astype(np.int64)).to_numpy()
+        keys.flags.writeable = False
+        return keys
+
+    # Every label is exactly 'YYYY Qn': the year is the first four characters
+    # and the quarter the last one, read straight off a fixed-width numpy array.
+    values = dates.to_numpy(dtype=str)
+    years = values.astype("U4").astype(np.int64)
+    width = values.dtype.itemsize // np.dtype("U1").itemsize
+    chars = values.view("U1").reshape(-1, width)
+    quarters = chars[np.arange(values.size), np.char.str_len(values) - 1].astype(np.int64)
+    keys = years * 10 + quarters
+    keys.flags.writeable = False  # shared by every caller with the same labels
+    return keys
+
+
+def quarter_sort_key(dates: pd.Series) -> pd.Series:
+    # The same Date column is keyed by several stages (each input, the merged
+    # path, the path re-read by stage 01); compute each distinct one once.
+    return pd.Series(_label_keys(tuple(dates.tolist())), index=dates.index)
+
+
+def sort_by_date(df: pd.DataFrame) -> pd.DataFrame:
+    key = quarter_sort_key(df[DATE_COLUMN]).to_numpy()
+    return df.iloc[np.argsort(key, kind="stable")].reset_index(drop=True)
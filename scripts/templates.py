@@ -0,0 +1,98 @@
+"""
+Placeholder templates shared by the Markdown commentary stages.
+
+Usage:
+    from templates import compile_template, get_field_value
+
+    for segment in compile_template("GDP falls {GDP.shock_abs:.1f}%"):
+        if isinstance(segment, str):
+            ...                                   # literal text
+        else:
+            is_baseline, factor, field, fmt_spec, unit = segment
+            value = get_field_value(factor, field, shock_data, t0_data)
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, Tuple, Union
+
+
+# Marker for computed values
+COMPUTED_MARKER = "`[computed]`"
+
+# {baseline.Factor.agg[:fmt]} or {Factor.field[:fmt]}, plus an optional trailing unit.
+# Baseline tokens are tried first, so "baseline" is never read as a factor name.
+PLACEHOLDER_PATTERN = re.compile(
+    r'\{(?:baseline\.(?P<baseline_factor>[^.}]+)\.(?P<agg>[a-z]+)'
+    r'|(?P<factor>[^.}]+)\.(?P<field>[a-z_]+))'
+    r'(?::(?P<fmt>[^}]+))?\}(?P<unit>%|bps|ppts|pts)?'
+)
+
+# Literal text, or a (is baseline, factor, field/agg, format spec, unit) placeholder
+Segment = Union[str, Tuple[bool, str, str, str, str]]
+
+
+def _shock(entry: Dict[str, Any], t0_data: Dict[str, float], factor: str) -> float | None:
+    return entry.get("shock_value")
+
+
+def _shock_abs(entry: Dict[str, Any], t0_data: Dict[str, float], factor: str) -> float | None:
+    val = entry.get("shock_value")
+    return abs(val) if val is not None else None
+
+
+def _shock_bps(entry: Dict[str, Any], t0_data: Dict[str, float], factor: str) -> float | None:
+    val = entry.get("shock_value")
+    return abs(val) * 100 if val is not None else None
+
+
+def _extreme(entry: Dict[str, Any], t0_data: Dict[str, float], factor: str) -> float | None:
+    return entry.get("extreme_value")
+
+
+def _t0(entry: Dict[str, Any], t0_data: Dict[str, float], factor: str) -> float | None:
+    return t0_data.get(factor)
+
+
+FIELD_GETTERS: Dict[str, Callable[[Dict[str, Any], Dict[str, float], str], float | None]] = {
+    "shock": _shock,
+    "shock_abs": _shock_abs,
+    "shock_bps": _shock_bps,
+    "extreme": _extreme,
+    "t0": _t0,
+}
+
+
+def get_field_value(
+    factor: str,
+    field: str,
+    shock_data: Dict[str, Dict[str, Any]],
+    t0_data: Dict[str, float],
+) -> float | None:
+    """Extract a field value for a given factor."""
+    getter = FIELD_GETTERS.get(field)
+    if getter is None:
+        return None
+    return getter(shock_data.get(factor, {}), t0_data, factor)
+
+
+@lru_cache(maxsize=None)
+def compile_template(template: str) -> Tuple[Segment, ...]:
+    """Split a template into literal text and placeholders; each distinct template is scanned once."""
+    segments: list[Segment] = []
+    pos = 0
+    for match in PLACEHOLDER_PATTERN.finditer(template):
+        if match.start() > pos:
+            segments.append(template[pos:match.start()])
+        baseline_factor = match.group("baseline_factor")
+        if baseline_factor is not None:
+            key = (True, baseline_factor, match.group("agg"))
+        else:
+            key = (False, match.group("factor"), match.group("field"))
+        segments.append((*key, match.group("fmt") or "", match.group("unit") or ""))
+        pos = match.end()
+    if pos < len(template):
+        segments.append(template[pos:])
+    return tuple(segments)
@@ -0,0 +1,53 @@
+import importlib
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+derive = importlib.import_module("01_derive_macro_features")
+
+
+def test_insert_columns_after_anchor_on_inserted_column():
+    df = pd.DataFrame({"A": [1.0], "Z": [9.0]})
+
+    result = derive.insert_columns_after(df, [("A", "B", [2.0]), ("B", "C", [3.0])])
+
+    assert result.columns.tolist() == ["A", "B", "C", "Z"]
+    assert result.iloc[0].tolist() == [1.0, 2.0, 3.0, 9.0]
+
+
+def test_insert_columns_after_moves_existing_column():
+    df = pd.DataFrame({"A": [1.0], "B": [0.0], "Z": [9.0]})
+
+    result = derive.insert_columns_after(df, [("Z", "B", [2.0])])
+
+    assert result.columns.tolist() == ["A", "Z", "B"]
+    assert result["B"].tolist() == [2.0]
+
+
+def test_insert_columns_after_missing_anchor_raises():
+    df = pd.DataFrame({"A": [1.0]})
+
+    with pytest.raises(KeyError):
+        derive.insert_columns_after(df, [("X", "B", [2.0])])
+
+
+def test_insert_keys_after_appends_missing_anchors_in_insertion_order():
+    mapping = {"a": 1.0, "z": 9.0}
+
+    result = derive.insert_keys_after(mapping, [("x", "p", 1.0), ("y", "q", 2.0), ("x", "r", 3.0)])
+
+    assert list(result) == ["a", "z", "p", "q", "r"]
+
+
+def test_insert_keys_after_anchor_on_inserted_key():
+    mapping = {"a": 1.0, "z": 9.0}
+
+    result = derive.insert_keys_after(mapping, [("a", "b", 2.0), ("b", "c", 3.0)])
+
+    assert result == {"a": 1.0, "b": 2.0, "c": 3.0, "z": 9.0}
+    assert list(result) == ["a", "b", "c", "z"]
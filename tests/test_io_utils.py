@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import io_utils  # noqa: E402
+
+PAYLOAD = {
+    "a": float("nan"),
+    "b": "café\n\"q\"",
+    "c": [np.float64(1.5), np.array([1, 2]), np.float32("inf"), (1, None), [], {}],
+    "d": {"e": -0.0, "f": 1e300, "g": True, "h": np.int64(7), "i": 1e-5, "j": 2.5e-7, "k": np.float32(0.1)},
+}
+
+EXPECTED = (
+    '{\n  "a": null,\n  "b": "café\\n\\"q\\"",\n  "c": [\n    1.5,\n    [\n      1,\n      2\n    ],\n'
+    '    null,\n    [\n      1,\n      null\n    ],\n    [],\n    {}\n  ],\n  "d": {\n    "e": -0.0,\n'
+    '    "f": 1e300,\n    "g": true,\n    "h": 7,\n    "i": 0.00001,\n    "j": 2.5e-7,\n    "k": 0.1\n  }\n}'
+).encode("utf-8")
+
+
+def test_write_json_fallback_bytes(tmp_path, monkeypatch):
+    monkeypatch.setattr(io_utils, "ORJSON_AVAILABLE", False)
+    path = tmp_path / "out.json"
+
+    io_utils.write_json(PAYLOAD, path)
+
+    assert path.read_bytes() == EXPECTED
+
+
+@pytest.mark.skipif(not io_utils.ORJSON_AVAILABLE, reason="orjson not installed")
+def test_write_json_same_bytes_with_and_without_orjson(tmp_path, monkeypatch):
+    with_orjson = tmp_path / "orjson.json"
+    io_utils.write_json(PAYLOAD, with_orjson)
+    monkeypatch.setattr(io_utils, "ORJSON_AVAILABLE", False)
+    without_orjson = tmp_path / "stdlib.json"
+    io_utils.write_json(PAYLOAD, without_orjson)
+
+    assert with_orjson.read_bytes() == without_orjson.read_bytes() == EXPECTED
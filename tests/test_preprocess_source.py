@@ -0,0 +1,98 @@
+import importlib
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+preprocess = importlib.import_module("00_preprocess_source")
+
+
+def _write(path: Path, frame: pd.DataFrame) -> Path:
+    frame.to_csv(path, index=False)
+    return path
+
+
+def _merge_reference(file_map):
+    frames = [preprocess._load_scenario_frame(path) for path in file_map.values()]
+    merged = frames[0]
+    for df in frames[1:]:
+        merged = pd.merge(merged, df, on="Date", how="outer", sort=False)
+    return preprocess.sort_by_date(merged)
+
+
+def test_build_scenario_path_duplicate_and_missing_quarters(tmp_path):
+    domestic = _write(
+        tmp_path / "severely_adverse_domestic.csv",
+        pd.DataFrame({"Date": ["2025 Q1", "2025 Q2", "2025 Q3"], "GDP": [1.0, 2.0, 3.0]}),
+    )
+    international = _write(
+        tmp_path / "severely_adverse_international.csv",
+        pd.DataFrame({"Date": ["2025 Q1", "2025 Q1", "2025 Q2"], "FX": [10.0, 11.0, 12.0]}),
+    )
+    file_map = {"domestic": domestic, "international": international}
+
+    result = preprocess.build_scenario_path(file_map)
+
+    pd.testing.assert_frame_equal(result, _merge_reference(file_map))
+    assert len(result) == 4
+    assert sorted(result["FX"].dropna().tolist()) == [10.0, 11.0, 12.0]
+    assert np.isnan(result.loc[result["Date"] == "2025 Q3", "FX"]).all()
+
+
+def test_build_scenario_path_partial_coverage(tmp_path):
+    domestic = _write(
+        tmp_path / "severely_adverse_domestic.csv",
+        pd.DataFrame({"Date": ["2025 Q1", "2025 Q2", "2025 Q3"], "GDP": [1.0, 2.0, 3.0]}),
+    )
+    international = _write(
+        tmp_path / "severely_adverse_international.csv",
+        pd.DataFrame({"Date": ["2025 Q2", "2025 Q4"], "FX": [12.0, 14.0]}),
+    )
+    file_map = {"domestic": domestic, "international": international}
+
+    result = preprocess.build_scenario_path(file_map)
+
+    assert result["Date"].tolist() == ["2025 Q1", "2025 Q2", "2025 Q3", "2025 Q4"]
+    assert result["GDP"].tolist()[:3] == [1.0, 2.0, 3.0]
+    assert np.isnan(result["GDP"].iloc[3])
+    assert np.isnan(result["FX"].iloc[0]) and np.isnan(result["FX"].iloc[2])
+    assert result["FX"].iloc[[1, 3]].tolist() == [12.0, 14.0]
+
+
+def test_classify_source_is_order_independent():
+    assert preprocess._classify_source("domestic_baseline.csv") == ("baseline", "domestic")
+    assert preprocess._classify_source("2025-Table_1A_Historic_Domestic.csv") == ("historic", "domestic")
+    assert preprocess._classify_source("International-Severely-Adverse.csv") == ("severely_adverse", "international")
+    assert preprocess._classify_source("notes_domestic.csv") is None
+
+
+def test_get_source_files_sees_files_added_later(tmp_path):
+    class _Paths:
+        source_dir = tmp_path
+
+    _write(tmp_path / "historic_domestic.csv", pd.DataFrame({"Date": ["2025 Q1"]}))
+    historic, _, baseline = preprocess.get_source_files(_Paths())
+    assert set(historic) == {"domestic"} and baseline == {}
+
+    _write(tmp_path / "international_baseline.csv", pd.DataFrame({"Date": ["2025 Q1"]}))
+    _, _, baseline = preprocess.get_source_files(_Paths())
+    assert set(baseline) == {"international"}
+
+
+def test_build_scenario_path_rejects_shared_columns(tmp_path):
+    domestic = _write(
+        tmp_path / "severely_adverse_domestic.csv",
+        pd.DataFrame({"Date": ["2025 Q1", "2025 Q2"], "GDP": [1.0, 2.0]}),
+    )
+    international = _write(
+        tmp_path / "severely_adverse_international.csv",
+        pd.DataFrame({"Date": ["2025 Q1", "2025 Q2"], "GDP": [5.0, 6.0], "FX": [10.0, 11.0]}),
+    )
+
+    with pytest.raises(ValueError, match="GDP"):
+        preprocess.build_scenario_path({"domestic": domestic, "international": international})
@@ -0,0 +1,27 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import quarters  # noqa: E402
+
+
+def test_quarter_sort_key_plain_labels():
+    dates = pd.Series(["2025 Q3", "2024Q4", "1976 Q1"])
+
+    assert quarters.quarter_sort_key(dates).tolist() == [20253, 20244, 19761]
+
+
+def test_quarter_sort_key_accepts_surrounding_whitespace():
+    dates = pd.Series(["2025 Q2 ", " 2025 Q1"])
+
+    assert quarters.quarter_sort_key(dates).tolist() == [20252, 20251]
+
+
+def test_quarter_sort_key_rejects_labels_without_a_quarter():
+    with pytest.raises(ValueError):
+        quarters.quarter_sort_key(pd.Series(["2025 Q1", "bad"]))